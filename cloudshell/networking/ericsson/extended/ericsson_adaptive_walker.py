@@ -0,0 +1,249 @@
+import time
+
+from pysnmp.entity.rfc3413.oneliner.cmdgen import UdpTransportTarget
+from pysnmp.error import PySnmpError
+from pysnmp.proto import errind
+from pysnmp.smi.rfc1902 import ObjectIdentity
+
+from cloudshell.networking.ericsson.extended.ericsson_mib_resolver import mib_resolver
+from cloudshell.snmp.quali_snmp import QualiMibTable
+
+
+END_OF_WALK_VALUES = ('EndOfMibView', 'NoSuchObject', 'NoSuchInstance')
+TOO_BIG_ERROR_STATUS = 1
+
+
+class SnmpRequestTimeout(Exception):
+    pass
+
+
+class SnmpResponseTooBig(Exception):
+    pass
+
+
+class QualiSnmpBulkClient(object):
+    def __init__(self, snmp_handler, symbol_resolver=None):
+        """Single GETBULK requests with the provided timeout, sent with QualiSnmp engine and credentials
+
+        Requests are sent without pysnmp retries, AdaptiveSnmpWalker retries them itself.
+        Requests carry numeric OIDs, symbols are resolved by the process wide MIB resolver,
+        so the snmp handler doesn't need to load any MIB
+
+        :param snmp_handler: QualiSnmp instance
+        :param symbol_resolver: MibSymbolResolver, the process wide one if not provided
+        """
+
+        self.snmp_handler = snmp_handler
+        self.symbol_resolver = symbol_resolver or mib_resolver
+        self._targets = {}
+
+    def _get_target(self, timeout):
+        timeout = round(timeout, 1)
+        if timeout not in self._targets:
+            # pysnmp caches target addresses by tag list, so every timeout needs its own tag
+            self._targets[timeout] = UdpTransportTarget(self.snmp_handler.target.transportAddr, timeout=timeout,
+                                                        retries=0, tagList='adaptive-walk-{0}'.format(timeout))
+        return self._targets[timeout]
+
+    def get_table_oid(self, snmp_module_name, table_name):
+        """Resolve table or column name to its OID
+
+        :return: OID tuple
+        """
+
+        return self.symbol_resolver.get_oid(snmp_module_name, table_name)
+
+    def get_bulk(self, oid, max_repetitions, timeout):
+        """Send single GETBULK request
+
+        :param oid: OID tuple to start from
+        :param max_repetitions: max-repetitions of the request
+        :param timeout: request timeout in seconds
+        :return: list of (OID tuple, column name, index suffix, value, var bind) following the requested OID,
+            value is None for endOfMibView, noSuchObject and noSuchInstance
+        :raise SnmpRequestTimeout: if no response was received before the timeout
+        :raise SnmpResponseTooBig: if the agent could not fit the response into a single message
+        """
+
+        error_indication, error_status, error_index, var_bind_table = self.snmp_handler.cmd_gen.bulkCmd(
+            self.snmp_handler.security, self._get_target(timeout), 0, max_repetitions,
+            ObjectIdentity('.'.join(str(part) for part in oid)), lexicographicMode=True, maxCalls=1)
+        if error_indication:
+            if isinstance(error_indication, errind.RequestTimedOut):
+                raise SnmpRequestTimeout(str(error_indication))
+            if isinstance(error_indication, errind.TooBig):
+                raise SnmpResponseTooBig(str(error_indication))
+            raise PySnmpError(str(error_indication))
+        if error_status:
+            if int(error_status) == TOO_BIG_ERROR_STATUS:
+                raise SnmpResponseTooBig(error_status.prettyPrint())
+            raise PySnmpError(error_status.prettyPrint())
+
+        result = []
+        for var_bind_row in var_bind_table:
+            var_bind = var_bind_row[0]
+            if var_bind[1].__class__.__name__ in END_OF_WALK_VALUES:
+                result.append((tuple(var_bind[0].getOid()), '', '', None, var_bind))
+                break
+            oid = tuple(var_bind[0].getOid())
+            column_name, suffix = self.symbol_resolver.get_column(oid)
+            result.append((oid, column_name, suffix, var_bind[1].prettyPrint(), var_bind))
+        return result
+
+
+class AdaptiveSnmpWalker(object):
+    def __init__(self, snmp_handler, max_repetitions=25, min_repetitions=1, max_repetitions_limit=200,
+                 timeout=1.0, max_timeout=16.0, max_retries=5, target_response_time=0.5,
+                 target_response_size=8192):
+        """Walk SNMP tables with GETBULK requests sized by the observed device behaviour
+
+        max-repetitions grows while responses are fast and small and shrinks when they get slow or big.
+        On timeout the request is repeated from the last received OID with twice the timeout,
+        so the walk never restarts from the beginning of the table. A single timeout is taken for a lost packet,
+        max-repetitions is halved only if the request times out again or the response doesn't fit into a message.
+        Learned max-repetitions and timeout are kept for the following walks of the same device.
+        Response times are measured with the clock method of the snmp handler if it has one, i.e. simulated time
+        of the replayed device, with time.time otherwise.
+
+        :param snmp_handler: QualiSnmp instance or any snmp handler with get_bulk and get_table_oid methods
+        :param max_repetitions: max-repetitions of the first request
+        :param min_repetitions: lower limit of max-repetitions
+        :param max_repetitions_limit: upper limit of max-repetitions
+        :param timeout: initial request timeout in seconds
+        :param max_timeout: upper limit of the request timeout in seconds
+        :param max_retries: number of consecutive timeouts after which the walk fails
+        :param target_response_time: desired response time in seconds
+        :param target_response_size: desired response size in bytes
+        """
+
+        if hasattr(snmp_handler, 'get_bulk'):
+            self.bulk_client = snmp_handler
+        else:
+            self.bulk_client = QualiSnmpBulkClient(snmp_handler)
+        self.snmp_handler = snmp_handler
+        self._clock = getattr(self.bulk_client, 'clock', time.time)
+        self.max_repetitions = max_repetitions
+        self.min_repetitions = min_repetitions
+        self.max_repetitions_limit = max_repetitions_limit
+        self.initial_timeout = timeout
+        self.timeout = timeout
+        self.max_timeout = max_timeout
+        self.max_retries = max_retries
+        self.target_response_time = target_response_time
+        self.target_response_size = target_response_size
+        self.request_count = 0
+        self.timeout_count = 0
+        self.var_binds = []
+
+    def walk(self, snmp_module_name, table_name, expected_rows=None, first_index=None, last_index=None):
+        """Walk the table or column, or only the range of its rows
+
+        If the number of rows is known in advance, i.e. a column of the already walked table,
+        requests are limited to the remaining rows plus one, so the last response doesn't run
+        max-repetitions var binds past the end of the column.
+
+        :param snmp_module_name: MIB name, i.e. 'IF-MIB'
+        :param table_name: table or column name, i.e. 'ifDescr'
+        :param expected_rows: expected number of var binds in the walked column or range
+        :param first_index: index of the first row to read, i.e. 20011 or '20011.0', from the column start if not set
+        :param last_index: index of the last row to read, till the column end if not set
+        :rtype: QualiMibTable
+        :return: table in the same format as QualiSnmp.walk returns
+        :raise SnmpRequestTimeout: if the device didn't respond max_retries times in a row
+        """
+
+        base_oid = self.bulk_client.get_table_oid(snmp_module_name, table_name)
+        result = QualiMibTable(table_name)
+        self.var_binds = []
+        current_oid = base_oid
+        first_oid = last_oid = None
+        if first_index is not None:
+            first_oid = base_oid + self._get_index_oid(first_index)
+            # GETBULK returns var binds following the requested OID, so the walk starts right before the first row
+            current_oid = first_oid[:-1] + (first_oid[-1] - 1,) if first_oid[-1] > 0 else first_oid[:-1]
+        if last_index is not None:
+            last_oid = base_oid + self._get_index_oid(last_index)
+        failures = 0
+        received = 0
+        while True:
+            requested_repetitions = self.max_repetitions
+            if expected_rows and received < expected_rows:
+                requested_repetitions = min(requested_repetitions, expected_rows - received + 1)
+            start_time = self._clock()
+            self.request_count += 1
+            try:
+                response = self.bulk_client.get_bulk(current_oid, requested_repetitions, self.timeout)
+            except (SnmpRequestTimeout, SnmpResponseTooBig) as e:
+                failures += 1
+                if isinstance(e, SnmpRequestTimeout):
+                    self.timeout_count += 1
+                    self.timeout = min(self.max_timeout, self.timeout * 2)
+                if failures > 1 or isinstance(e, SnmpResponseTooBig):
+                    self.max_repetitions = max(self.min_repetitions, self.max_repetitions // 2)
+                if failures > self.max_retries:
+                    raise SnmpRequestTimeout('Walk of {0}::{1} failed after {2} retries: {3}'.format(
+                        snmp_module_name, table_name, self.max_retries, e))
+                continue
+            failures = 0
+            response_time = self._clock() - start_time
+            finished = not response
+            for oid, column_name, suffix, value, var_bind in response:
+                if value is None or oid[:len(base_oid)] != base_oid or oid <= current_oid or \
+                        last_oid is not None and oid[:len(last_oid)] > last_oid:
+                    finished = True
+                    break
+                current_oid = oid
+                if first_oid is not None and oid < first_oid:
+                    continue
+                received += 1
+                index = self._get_index(suffix)
+                if not result.get(index):
+                    result[index] = {'suffix': suffix}
+                result[index][column_name] = value
+                if var_bind is not None:
+                    self.var_binds.append([var_bind])
+            # agents may return less var binds than requested if the response doesn't fit into a message
+            self._tune(response_time, response, requested_repetitions,
+                       truncated=not finished and len(response) < requested_repetitions)
+            if finished:
+                return result
+
+    def _tune(self, response_time, response, requested_repetitions, truncated=False):
+        """Adjust max-repetitions and timeout after the successful response
+
+        :param response_time: response time in seconds
+        :param response: list of received var binds
+        :param requested_repetitions: max-repetitions of the request, less than max_repetitions if it was limited
+            by the expected number of rows
+        :param truncated: agent returned less var binds than requested in the middle of the walk
+        """
+
+        self.timeout = max(self.initial_timeout, min(self.timeout, response_time * 4))
+        response = [var_bind for var_bind in response if var_bind[3] is not None]
+        if not response:
+            return
+        if truncated:
+            self.max_repetitions = max(self.min_repetitions, min(self.max_repetitions_limit, len(response)))
+            return
+        response_size = sum(len(oid) * 2 + len(value) for oid, column_name, suffix, value, var_bind in response)
+        scale = min(self.target_response_time / max(response_time, 0.001),
+                    float(self.target_response_size) / max(response_size, 1))
+        if scale < 1:
+            max_repetitions = int(self.max_repetitions * max(scale, 0.5))
+        elif len(response) == requested_repetitions == self.max_repetitions:
+            max_repetitions = max(requested_repetitions + 1, int(requested_repetitions * min(scale, 2)))
+        else:
+            max_repetitions = self.max_repetitions
+        self.max_repetitions = max(self.min_repetitions, min(self.max_repetitions_limit, max_repetitions))
+
+    @staticmethod
+    def _get_index_oid(index):
+        return tuple(int(part) for part in str(index).split('.'))
+
+    @staticmethod
+    def _get_index(suffix):
+        if suffix.isdigit():
+            return int(suffix)
+        if suffix.replace('.', '', 1).isdigit():
+            return float(suffix)
+        return suffix
@@ -1,7 +1,7 @@
 from cloudshell.networking.autoload.networking_autoload_resource_attributes import GenericResourceAttribute, \
     NetworkingStandardPortAttributes, NetworkingStandardModuleAttributes
 from cloudshell.networking.autoload.networking_autoload_resource_structure import GenericResource, Port
-from cloudshell.shell.core.driver_context import AutoLoadAttribute
+from cloudshell.shell.core.driver_context import AutoLoadAttribute, AutoLoadResource
 
 
 class PFEResourceAttributes(GenericResourceAttribute):
@@ -45,3 +45,72 @@ class EricssonModule(GenericResource):
     def __init__(self, name='', model='Generic Module', relative_path='', **attributes_dict):
         self.attributes_class = EricssonModuleAttributes
         GenericResource.__init__(self, name, model, relative_path, **attributes_dict)
+
+
+class CompactResource(object):
+    """Resource which keeps attribute values in slots and builds AutoLoadAttribute objects only when serialized
+
+    ATTRIBUTES is a tuple of (attribute key, CloudShell attribute name, default value),
+    every subclass lists the same keys in its __slots__.
+    """
+
+    __slots__ = ('name', 'model', 'relative_path', 'uniqe_id')
+    ATTRIBUTES = ()
+    DEFAULT_MODEL = ''
+
+    def __init__(self, name='', model=None, relative_path='', uniqe_id=None, **attributes_dict):
+        self.name = name
+        self.model = self.DEFAULT_MODEL if model is None else model
+        self.relative_path = relative_path
+        self.uniqe_id = uniqe_id
+        for key, attribute_name, default_value in self.ATTRIBUTES:
+            setattr(self, key, attributes_dict.pop(key, default_value))
+        if attributes_dict:
+            raise TypeError('{0} got unexpected attributes: {1}'.format(type(self).__name__,
+                                                                        ', '.join(sorted(attributes_dict))))
+
+    def get_autoload_resource_details(self):
+        if self.model == '' or self.name == '' or self.relative_path == '':
+            raise Exception('Ericsson Extended SNMP Autoload', 'Resources details not found!')
+        return AutoLoadResource(self.model, self.name, self.relative_path, self.uniqe_id or None)
+
+    def get_autoload_resource_attributes(self):
+        return [AutoLoadAttribute(self.relative_path, attribute_name, getattr(self, key))
+                for key, attribute_name, default_value in self.ATTRIBUTES]
+
+
+class CompactPFE(CompactResource):
+    __slots__ = ()
+    DEFAULT_MODEL = 'PFE'
+
+
+class CompactEricssonPort(CompactResource):
+    ATTRIBUTES = (('description', 'Port Description', ''),
+                  ('l2_protocol_type', 'L2 Protocol Type', 'ethernet'),
+                  ('mac', 'MAC Address', ''),
+                  ('mtu', 'MTU', 0),
+                  ('duplex', 'Duplex', ''),
+                  ('auto_negotiation', 'Auto Negotiation', ''),
+                  ('bandwidth', 'Bandwidth', 0),
+                  ('adjacent', 'Adjacent', ''),
+                  ('ipv4_address', 'IPv4 Address', ''),
+                  ('ipv6_address', 'IPv6 Address', ''),
+                  ('supports_1ge', 'Supports 1 Gigabit', False),
+                  ('supports_10ge', 'Supports 10 Gigabit', False),
+                  ('supports_40ge', 'Supports 40 Gigabit', False),
+                  ('supports_100ge', 'Supports 100 Gigabit', False))
+    __slots__ = tuple(attribute[0] for attribute in ATTRIBUTES)
+    DEFAULT_MODEL = 'Generic Port'
+
+    def __init__(self, name='', model=None, relative_path='', uniqe_id=None, **attributes_dict):
+        port_name = name.replace('/', '-').replace('\s+', '')
+        CompactResource.__init__(self, port_name, model, relative_path, uniqe_id, **attributes_dict)
+
+
+class CompactEricssonModule(CompactResource):
+    ATTRIBUTES = (('serial_number', 'Serial Number', ''),
+                  ('module_model', 'Model', ''),
+                  ('version', 'Version', ''),
+                  ('ericsson_model', 'Ericsson Model', ''))
+    __slots__ = tuple(attribute[0] for attribute in ATTRIBUTES)
+    DEFAULT_MODEL = 'Generic Module'
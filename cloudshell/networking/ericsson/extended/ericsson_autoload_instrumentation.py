@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+
+from cloudshell.shell.core.driver_context import AutoLoadResource
+
+
+class InstrumentedSnmpHandler(object):
+    def __init__(self, snmp_handler, statistics=None):
+        """Proxy of the snmp handler which counts and times every SNMP operation
+
+        get and get_property are counted as one request, get_properties as one request per property.
+        GETNEXT walk is counted as one request per received var bind plus the request which reaches the end
+        of the walked table. Operations are recorded under the lock, so handlers of the request pipeline workers
+        can record them into the statistics of the main handler.
+
+        :param snmp_handler: QualiSnmp instance
+        :param statistics: InstrumentedSnmpHandler which records operations of this one,
+            used for additional snmp handlers of the same device
+        """
+
+        self._snmp_handler = snmp_handler
+        self._statistics = statistics or self
+        self._lock = threading.Lock()
+        self.get_count = 0
+        self.walk_count = 0
+        self.operations = {}
+
+    def __getattr__(self, item):
+        return getattr(self._snmp_handler, item)
+
+    @property
+    def request_count(self):
+        return self.get_count + self.walk_count
+
+    def _account(self, operation, name, start_time, requests):
+        self._statistics.record(operation, name, time.time() - start_time, requests)
+
+    def record(self, operation, name, wall_time, requests=1):
+        """Store timing of a single SNMP operation, also used for operations done by other handlers of the device
+
+        :param operation: 'get' or 'walk'
+        :param name: requested MIB object, i.e. 'IF-MIB::ifAlias'
+        :param wall_time: operation duration in seconds
+        :param requests: number of requests done by the operation
+        """
+
+        with self._lock:
+            if operation == 'walk':
+                self.walk_count += requests
+            else:
+                self.get_count += requests
+            statistics = self.operations.setdefault((operation, name), [0, 0.0])
+            statistics[0] += requests
+            statistics[1] += wall_time
+
+    @staticmethod
+    def _get_name(oid):
+        if isinstance(oid, (list, tuple)):
+            return '::'.join(str(part) for part in oid[:2])
+        return str(oid)
+
+    def get(self, *oids):
+        start_time = time.time()
+        try:
+            return self._snmp_handler.get(*oids)
+        finally:
+            self._account('get', ', '.join(self._get_name(oid) for oid in oids), start_time, 1)
+
+    def get_property(self, snmp_module_name, property_name, index, return_type='str'):
+        start_time = time.time()
+        try:
+            return self._snmp_handler.get_property(snmp_module_name, property_name, index, return_type)
+        finally:
+            self._account('get', '{0}::{1}'.format(snmp_module_name, property_name), start_time, 1)
+
+    def get_properties(self, snmp_mib_name, index, properties_map):
+        start_time = time.time()
+        try:
+            return self._snmp_handler.get_properties(snmp_mib_name, index, properties_map)
+        finally:
+            self._account('get', '{0}::{1}'.format(snmp_mib_name, ', '.join(sorted(properties_map))), start_time,
+                          len(properties_map))
+
+    @staticmethod
+    def _get_walk_request_count(table):
+        if not table:
+            return 1
+        return sum(len([column for column in row if column != 'suffix']) for row in table.values()) + 1
+
+    def get_table(self, snmp_module_name, table_name):
+        start_time = time.time()
+        table = None
+        try:
+            table = self._snmp_handler.get_table(snmp_module_name, table_name)
+            return table
+        finally:
+            self._account('walk', '{0}::{1}'.format(snmp_module_name, table_name), start_time,
+                          self._get_walk_request_count(table))
+
+    def walk(self, oid, *indexes):
+        start_time = time.time()
+        table = None
+        try:
+            table = self._snmp_handler.walk(oid, *indexes)
+            return table
+        finally:
+            var_binds = getattr(self._snmp_handler, 'var_binds', None)
+            if indexes and isinstance(var_binds, list):
+                # walked rows are filtered by indexes, the table doesn't show how many var binds were received
+                requests = len(var_binds) + 1
+            else:
+                requests = self._get_walk_request_count(table)
+            self._account('walk', self._get_name(oid), start_time, requests)
+
+    def load_mib(self, mib_list):
+        start_time = time.time()
+        try:
+            return self._snmp_handler.load_mib(mib_list)
+        finally:
+            self._account('load_mib', ', '.join(mib_list), start_time, 0)
+
+
+class AutoloadInstrumentation(object):
+    def __init__(self, sink=None, log_level=logging.INFO):
+        """Collector of per phase autoload statistics: wall time, SNMP requests and discovered resources
+
+        :param sink: callable which receives every phase record, or logger which gets it as a structured log record
+            in the 'autoload_phase' extra field, records are only collected if sink is None
+        :param log_level: level of the log records if sink is a logger
+        """
+
+        self.sink = sink
+        self.log_level = log_level
+        self.snmp_handler = None
+        self.phases = []
+        self._start_time = None
+
+    def copy(self):
+        """Build instrumentation with the same sink for another autoload,
+        statistics can't be shared by autoloads running at the same time
+
+        :rtype: AutoloadInstrumentation
+        """
+
+        return AutoloadInstrumentation(self.sink, self.log_level)
+
+    def start(self, snmp_handler):
+        """Reset collected statistics and wrap snmp handler
+
+        :param snmp_handler: snmp handler used by autoload
+        :return: InstrumentedSnmpHandler which should be used during the autoload
+        """
+
+        self.snmp_handler = InstrumentedSnmpHandler(snmp_handler)
+        self.phases = []
+        self._start_time = time.time()
+        return self.snmp_handler
+
+    def wrap(self, snmp_handler):
+        """Wrap additional snmp handler of the same device, i.e. handler of the request pipeline worker
+
+        :param snmp_handler: snmp handler
+        :return: InstrumentedSnmpHandler which records its operations with operations of the main snmp handler
+        """
+
+        return InstrumentedSnmpHandler(snmp_handler, self.snmp_handler)
+
+    def run_phase(self, name, resources, attributes, method, *args):
+        """Run single autoload phase and emit its record
+
+        :param name: phase name, i.e. 'ports'
+        :param resources: list of autoload resources, used to count resources discovered during the phase
+        :param attributes: list of autoload attributes, used to count attributes discovered during the phase
+        :param method: phase method
+        :return: result of the phase method
+        """
+
+        resource_count = len(resources)
+        attribute_count = len(attributes)
+        get_count = self.snmp_handler.get_count
+        walk_count = self.snmp_handler.walk_count
+        start_time = time.time()
+        try:
+            return method(*args)
+        finally:
+            self._add_phase(name, time.time() - start_time, get_count, walk_count,
+                            len(resources) - resource_count, len(attributes) - attribute_count)
+
+    def iter_phase(self, name, items):
+        """Streaming counterpart of run_phase, the phase record is emitted when items are exhausted,
+        time the consumer spends between items is not counted
+
+        :param name: phase name, i.e. 'ports'
+        :param items: generator of AutoLoadResource and AutoLoadAttribute built by the phase
+        :return: generator of the same items
+        """
+
+        resource_count = 0
+        attribute_count = 0
+        get_count = self.snmp_handler.get_count
+        walk_count = self.snmp_handler.walk_count
+        wall_time = 0.0
+        try:
+            while True:
+                start_time = time.time()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                finally:
+                    wall_time += time.time() - start_time
+                if isinstance(item, AutoLoadResource):
+                    resource_count += 1
+                else:
+                    attribute_count += 1
+                yield item
+        finally:
+            self._add_phase(name, wall_time, get_count, walk_count, resource_count, attribute_count)
+
+    def _add_phase(self, name, wall_time, get_count, walk_count, resource_count, attribute_count):
+        record = {'phase': name,
+                  'wall_time': wall_time,
+                  'snmp_gets': self.snmp_handler.get_count - get_count,
+                  'snmp_walks': self.snmp_handler.walk_count - walk_count,
+                  'resources': resource_count,
+                  'attributes': attribute_count}
+        record['snmp_requests'] = record['snmp_gets'] + record['snmp_walks']
+        self.phases.append(record)
+        self._emit(record)
+
+    def _emit(self, record):
+        if self.sink is None:
+            return
+        if isinstance(self.sink, (logging.Logger, logging.LoggerAdapter)):
+            self.sink.log(self.log_level, 'Autoload phase {phase}: {wall_time:.3f}s, {snmp_requests} SNMP requests, '
+                                          '{resources} resources, {attributes} attributes'.format(**record),
+                          extra={'autoload_phase': record})
+        else:
+            self.sink(record)
+
+    def get_summary(self, **entities):
+        """Build summary of the whole autoload
+
+        :param entities: number of discovered entities by type, i.e. ports=48
+        :return: dict with total wall time, SNMP requests, phases and slowest SNMP operations
+        """
+
+        operations = [{'operation': operation, 'name': name, 'requests': requests, 'wall_time': wall_time}
+                      for (operation, name), (requests, wall_time) in self.snmp_handler.operations.iteritems()]
+        operations.sort(key=lambda item: item['wall_time'], reverse=True)
+        return {'wall_time': time.time() - self._start_time,
+                'snmp_requests': self.snmp_handler.request_count,
+                'snmp_gets': self.snmp_handler.get_count,
+                'snmp_walks': self.snmp_handler.walk_count,
+                'entities': entities,
+                'phases': list(self.phases),
+                'snmp_operations': operations}
@@ -0,0 +1,114 @@
+import cPickle as pickle
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+INTERFACE_CHANGE_MARKERS = ('ifTableLastChange', 'lldpStatsRemTablesLastChangeTime', 'dot3adTablesLastChanged')
+# allowed difference of the boot times computed during two autoloads, covers request latency and clock adjustments
+BOOT_TIME_TOLERANCE = 60
+
+
+class AutoloadSnapshot(object):
+    def __init__(self, fingerprint, change_markers, entity_state, resources, attributes):
+        """Result of the device autoload together with the state required to reuse it
+
+        :param fingerprint: hash of the autoload settings the snapshot was built with
+        :param change_markers: dict {'sysUpTime': int, 'bootTime': float, 'entLastChangeTime': int,
+            'ifTableLastChange': int, 'lldpStatsRemTablesLastChangeTime': int or None,
+            'dot3adTablesLastChanged': int or None}, bootTime is the local time of the device boot,
+            local time of the sysUpTime reading minus sysUpTime
+        :param entity_state: dict with discovered entity table, entity lists and linecard PFE maps
+        :param resources: list of AutoLoadResource
+        :param attributes: list of AutoLoadAttribute
+        """
+
+        self.fingerprint = fingerprint
+        self.change_markers = change_markers
+        self.entity_state = entity_state
+        self.resources = resources
+        self.attributes = attributes
+        self.timestamp = time.time()
+
+    def is_valid(self, fingerprint, change_markers):
+        """Check whether the snapshot was built with the same settings since the same device boot.
+        Change markers are sysUpTime values, so they can only be compared if boot times of both snapshots match,
+        a device rebooted earlier than it was up at the previous autoload would pass sysUpTime comparison
+        """
+
+        boot_time = self.change_markers.get('bootTime')
+        return self.fingerprint == fingerprint and boot_time is not None and \
+            abs(change_markers['bootTime'] - boot_time) <= BOOT_TIME_TOLERANCE
+
+    def is_entity_changed(self, change_markers):
+        return change_markers['entLastChangeTime'] != self.change_markers['entLastChangeTime']
+
+    def is_interface_changed(self, change_markers):
+        """Check whether interfaces, LLDP neighbors or port-channel members were changed,
+        markers the device doesn't support are None in both snapshots
+        """
+
+        return any(change_markers.get(name) != self.change_markers.get(name) for name in INTERFACE_CHANGE_MARKERS)
+
+
+class AutoloadSnapshotStore(object):
+    def __init__(self, storage_path=None, max_age=None):
+        """Storage of the last autoload snapshot of every device
+
+        :param storage_path: folder to persist snapshots to, snapshots are kept in memory only if not provided
+        :param max_age: snapshots older than max_age seconds are ignored, they never expire if not provided
+        """
+
+        self.storage_path = storage_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshots = {}
+
+    def _get_file_path(self, device_key):
+        return os.path.join(self.storage_path, hashlib.md5(device_key).hexdigest() + '.snapshot')
+
+    def get(self, device_key):
+        """Get the last snapshot of the device
+
+        :param device_key: unique device identifier, i.e. device address
+        :rtype: AutoloadSnapshot
+        """
+
+        with self._lock:
+            snapshot = self._snapshots.get(device_key)
+        if snapshot is None and self.storage_path:
+            try:
+                with open(self._get_file_path(device_key), 'rb') as snapshot_file:
+                    snapshot = pickle.load(snapshot_file)
+            except (IOError, OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+                snapshot = None
+        if snapshot and self.max_age is not None and time.time() - snapshot.timestamp > self.max_age:
+            snapshot = None
+        return snapshot
+
+    def set(self, device_key, snapshot):
+        """Store the snapshot of the device, replacing the previous one
+
+        :param device_key: unique device identifier, i.e. device address
+        :param snapshot: AutoloadSnapshot
+        """
+
+        with self._lock:
+            self._snapshots[device_key] = snapshot
+        if self.storage_path:
+            if not os.path.isdir(self.storage_path):
+                os.makedirs(self.storage_path)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.storage_path)
+            with os.fdopen(file_descriptor, 'wb') as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, pickle.HIGHEST_PROTOCOL)
+            file_path = self._get_file_path(device_key)
+            if os.name == 'nt' and os.path.exists(file_path):
+                os.remove(file_path)
+            os.rename(temp_path, file_path)
+
+    def remove(self, device_key):
+        with self._lock:
+            self._snapshots.pop(device_key, None)
+        if self.storage_path and os.path.exists(self._get_file_path(device_key)):
+            os.remove(self._get_file_path(device_key))
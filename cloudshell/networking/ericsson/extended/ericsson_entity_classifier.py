@@ -0,0 +1,200 @@
+import copy
+import re
+import threading
+
+
+class EricssonEntityClassifier(object):
+    ENTITY_CLASS_PATTERN = r'stack|chassis|module|port|powerSupply|container|backplane'
+    PORT_ID_PATTERN = r'.*(\d+/)+?\d+'
+    PORT_NAME_PATTERN = r'^(?P<port>port)\s*(?P<name>\S+)\s*(?P<id>(\d+/)?\d+)'
+    SERIAL_NUMBER_PATTERN = r'(?<=SN:)\s*\S+'
+    CHASSIS_MODEL_PATTERN = r'chassis.*'
+    MODULE_MODEL_SUFFIX_PATTERN = r'\s[Cc]ard.*$'
+
+    def __init__(self, port_exclude_pattern='', port_ethernet_vendor_type_pattern='',
+                 vendor_type_exclusion_pattern=None, module_details_regexp=''):
+        """Compile all entity classification and port name normalization patterns once
+
+        :param port_exclude_pattern: pattern of port names and descriptions to skip, i.e. 'mgmt|serial'
+        :param port_ethernet_vendor_type_pattern: pattern of port vendor types which should be named as ethernet
+        :param vendor_type_exclusion_pattern: pattern or list of patterns of entity vendor types to skip
+        :param module_details_regexp: pattern with module_model, serial_number and version groups
+        """
+
+        self._port_exclude_re = re.compile(port_exclude_pattern, re.IGNORECASE)
+        self._port_ethernet_vendor_type_re = re.compile(port_ethernet_vendor_type_pattern, re.IGNORECASE) \
+            if port_ethernet_vendor_type_pattern else None
+        if not vendor_type_exclusion_pattern:
+            vendor_type_exclusion_pattern = []
+        elif isinstance(vendor_type_exclusion_pattern, basestring):
+            vendor_type_exclusion_pattern = [vendor_type_exclusion_pattern]
+        self._vendor_type_exclusion_res = [re.compile(pattern, re.IGNORECASE)
+                                           for pattern in vendor_type_exclusion_pattern]
+        self._module_details_re = re.compile(module_details_regexp, re.IGNORECASE)
+
+        self._entity_class_re = re.compile(self.ENTITY_CLASS_PATTERN)
+        self._port_id_re = re.compile(self.PORT_ID_PATTERN)
+        self._port_name_re = re.compile(self.PORT_NAME_PATTERN)
+        self._serial_number_re = re.compile(self.SERIAL_NUMBER_PATTERN, re.IGNORECASE)
+        self._chassis_model_re = re.compile(self.CHASSIS_MODEL_PATTERN, re.IGNORECASE)
+        self._module_model_suffix_re = re.compile(self.MODULE_MODEL_SUFFIX_PATTERN)
+        self._unknown_re = re.compile(r'.*unknown')
+        self._reset_memos()
+
+    def _reset_memos(self):
+        self._excluded_ports = {}
+        self._excluded_vendor_types = {}
+        self._entity_port_names = {}
+        self._port_names = {}
+        self._module_details = {}
+
+    def copy(self):
+        """Classifier with the same compiled patterns and empty memoized results
+
+        :rtype: EricssonEntityClassifier
+        """
+
+        classifier = copy.copy(self)
+        classifier._reset_memos()
+        return classifier
+
+    def classify(self, entity_class, vendor_type):
+        """Get normalized entity class
+
+        :param entity_class: entPhysicalClass value, i.e. "'module'"
+        :param vendor_type: entPhysicalVendorType value
+        :return: entity class, i.e. 'module', or None if entity vendor type is excluded
+        """
+
+        if self.is_excluded_vendor_type(vendor_type):
+            return None
+        return entity_class.replace("'", "")
+
+    def is_structure_class(self, entity_class):
+        """Check whether entity of the provided class is a part of the device structure
+
+        :param entity_class: normalized entity class, i.e. 'module'
+        """
+
+        return self._entity_class_re.search(entity_class) is not None
+
+    def is_excluded_vendor_type(self, vendor_type):
+        if vendor_type not in self._excluded_vendor_types:
+            self._excluded_vendor_types[vendor_type] = any(pattern.search(vendor_type.lower())
+                                                           for pattern in self._vendor_type_exclusion_res)
+        return self._excluded_vendor_types[vendor_type]
+
+    def is_excluded_port(self, *names):
+        """Check whether any of the provided port names or descriptions matches the port exclusion pattern
+        """
+
+        for name in names:
+            if name not in self._excluded_ports:
+                self._excluded_ports[name] = self._port_exclude_re.search(name) is not None
+            if self._excluded_ports[name]:
+                return True
+        return False
+
+    def get_entity_port_name(self, description, vendor_type):
+        """Build port name from the entity description
+
+        :param description: entPhysicalDescr value, i.e. 'Port Ethernet 1/2 unknown'
+        :param vendor_type: entPhysicalVendorType value
+        :return: normalized port name, i.e. 'port ethernet 1/2'
+        """
+
+        key = (description, vendor_type)
+        if key not in self._entity_port_names:
+            interface_name = description.lower()
+            if self._port_ethernet_vendor_type_re and self._port_ethernet_vendor_type_re.search(vendor_type):
+                interface_name = self._unknown_re.sub('ethernet', interface_name)
+            match_data = self._port_id_re.search(interface_name)
+            if match_data:
+                interface_name = match_data.group()
+            self._entity_port_names[key] = interface_name
+        return self._entity_port_names[key]
+
+    def normalize_port_name(self, interface_name):
+        """Move port keyword after the interface type, i.e. 'port ethernet 1/2' -> 'ethernet port 1/2'
+        """
+
+        if interface_name not in self._port_names:
+            result = interface_name
+            interface_name_match = self._port_name_re.search(interface_name)
+            if interface_name_match:
+                name_dict = interface_name_match.groupdict()
+                result = '{0} {1} {2}'.format(name_dict['name'], name_dict['port'], name_dict['id'])
+            self._port_names[interface_name] = result
+        return self._port_names[interface_name]
+
+    def get_module_info(self, description):
+        """Parse module model, version and serial number from the entity description
+
+        :return: dict {'module_model': '', 'version': '', 'serial_number': ''}
+        """
+
+        if description not in self._module_details:
+            module_details_map = {'module_model': '', 'version': '', 'serial_number': ''}
+            model_description = self._module_details_re.search(description)
+            if model_description:
+                result = model_description.groupdict()
+                module_details_map['module_model'] = result.get('module_model')
+                module_details_map['version'] = result.get('version')
+                module_details_map['serial_number'] = result.get('serial_number')
+            self._module_details[description] = module_details_map
+        return dict(self._module_details[description])
+
+    def get_module_model(self, module_model):
+        return self._module_model_suffix_re.sub('', module_model)
+
+    def get_serial_number(self, description):
+        serial_number_match = self._serial_number_re.search(description)
+        if serial_number_match:
+            return serial_number_match.group()
+        return ''
+
+    def get_chassis_model(self, vendor_type):
+        model_match = self._chassis_model_re.search(vendor_type)
+        if model_match:
+            return model_match.group()
+        return ''
+
+
+class EntityClassifierCache(object):
+    def __init__(self):
+        """Process wide cache of entity classifiers, so autoloads running with the same patterns
+        share compiled patterns. Memoized classification results are keyed by entity descriptions,
+        which include serial numbers, so every autoload run gets a classifier with its own memos
+        """
+
+        self._lock = threading.Lock()
+        self._classifiers = {}
+
+    def get(self, port_exclude_pattern='', port_ethernet_vendor_type_pattern='', vendor_type_exclusion_pattern=None,
+            module_details_regexp=''):
+        """Get classifier compiled from the provided patterns, see EricssonEntityClassifier
+
+        :return: classifier with empty memos, which should be used during a single autoload run
+        :rtype: EricssonEntityClassifier
+        """
+
+        if isinstance(vendor_type_exclusion_pattern, list):
+            vendor_type_exclusion_pattern = tuple(vendor_type_exclusion_pattern)
+        key = (port_exclude_pattern, port_ethernet_vendor_type_pattern, vendor_type_exclusion_pattern,
+               module_details_regexp)
+        with self._lock:
+            classifier = self._classifiers.get(key)
+            if classifier is None:
+                classifier = EricssonEntityClassifier(port_exclude_pattern, port_ethernet_vendor_type_pattern,
+                                                      list(vendor_type_exclusion_pattern)
+                                                      if isinstance(vendor_type_exclusion_pattern, tuple)
+                                                      else vendor_type_exclusion_pattern, module_details_regexp)
+                self._classifiers[key] = classifier
+        return classifier.copy()
+
+    def clear(self):
+        with self._lock:
+            self._classifiers.clear()
+
+
+entity_classifier_cache = EntityClassifierCache()
@@ -1,9 +1,23 @@
-from collections import defaultdict
+import hashlib
+import json
+import logging
+import os
 import re
+import sys
+import time
+import types
 from cloudshell.networking.autoload.networking_autoload_resource_structure import Chassis
 from cloudshell.networking.ericsson.autoload.ericsson_generic_snmp_autoload import EricssonGenericSNMPAutoload
-from cloudshell.networking.ericsson.extended.ericsson_autoload_entities import EricssonPort, PFE, EricssonModule
-from cloudshell.shell.core.driver_context import AutoLoadDetails
+from cloudshell.networking.ericsson.extended.ericsson_adaptive_walker import AdaptiveSnmpWalker, SnmpRequestTimeout
+from cloudshell.networking.ericsson.extended.ericsson_autoload_entities import CompactEricssonPort, CompactPFE, \
+    CompactEricssonModule
+from cloudshell.networking.ericsson.extended.ericsson_autoload_snapshot import AutoloadSnapshot
+from cloudshell.networking.ericsson.extended.ericsson_entity_classifier import entity_classifier_cache
+from cloudshell.networking.ericsson.extended.ericsson_indexed_collections import IndexedList, PortMapping
+from cloudshell.networking.ericsson.extended.ericsson_linecard_configuration import linecard_configuration_cache
+from cloudshell.networking.ericsson.extended.ericsson_mib_resolver import mib_resolver
+from cloudshell.networking.ericsson.extended.ericsson_snmp_pipeline import SnmpRequestPipeline
+from cloudshell.shell.core.driver_context import AutoLoadDetails, AutoLoadResource
 
 from cloudshell.snmp.quali_snmp import QualiMibTable
 
@@ -11,6 +25,16 @@ from cloudshell.snmp.quali_snmp import QualiMibTable
 class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
     IF_ENTITY = "ifDescr"
     ENTITY_PHYSICAL = "entPhysicalDescr"
+    ENTITY_TABLE_COLUMNS = ['entPhysicalContainedIn', 'entPhysicalClass', 'entPhysicalDescr', 'entPhysicalName']
+    ERICSSON_MIB_PATH = os.path.join(os.path.dirname(os.path.abspath(
+        sys.modules[EricssonGenericSNMPAutoload.__module__].__file__)), 'mib')
+    IF_TABLE_PORT_ATTR = {'ifName': 'str', 'ifAlias': 'str', 'ifType': 'str', 'ifPhysAddress': 'str', 'ifMtu': 'int',
+                          'ifHighSpeed': 'int'}
+    SELECTIVE_STRUCTURE_CLASSES = ['chassis', 'container', 'backplane', 'module']
+    SELECTIVE_TREE_COLUMNS = ['entPhysicalContainedIn', 'entPhysicalClass']
+    SELECTIVE_ENTITY_CLASSES = {'ports': 'port', 'power_ports': 'powerSupply'}
+    # selected rows whose first index parts differ by more than this are read as separate ranges
+    SELECTIVE_INDEX_GAP = 16
 
     def __init__(self, snmp_handler=None, logger=None, supported_os=None):
         """Basic init with injected snmp handler and logger
@@ -23,171 +47,524 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         self.configuration = None
         self._snmp = snmp_handler
         self._logger = logger
-        self.exclusion_list = []
         self._excluded_models = []
-        self.module_list = []
-        self.chassis_list = []
-        self.pfe_dict = defaultdict(dict)
         self.supported_os = supported_os
-        self.port_list = []
-        self.power_supply_list = []
-        self.relative_path = {}
-        self.port_mapping = {}
-        self.module_by_relative_path = {}
         self.interface_mapping_mib = None
         self.interface_mapping_key = None
-        self.interface_mapping_table = None
         self.port_exclude_pattern = r'serial|stack|engine|management|mgmt|voice|foreign'
         self.port_ethernet_vendor_type_pattern = ''
         self.vendor_type_exclusion_pattern = ''
         self.module_details_regexp = r'^(?P<module_model>.*)\s+[Cc]ard\s+sn:(?P<serial_number>.*)\s+rev:(?P<version>.*) mfg'
         self.load_mib_list = []
+        self.bulk_mode = True
+        self.snmp_handler_factory = None
+        self.max_in_flight = 1
+        self.adaptive_walk = True
         self.configuration_file_path = ''
-        self.missing_modules_oids = {}
+        self.instrumentation = None
+        self.snapshot_store = None
+        self.snapshot_key = None
+        self.result_log_level = logging.DEBUG
+        self.result_log_path = None
+        self._snmp_walker = None
+        self._reset_state()
+
+    def _reset_state(self):
+        """Drop everything discovered by the previous autoload, so the same instance can be reused
+
+        :return:
+        """
+
+        self._reset_entity_lists()
+        self.relative_path = {}
+        self.port_mapping = PortMapping()
+        self.module_by_relative_path = {}
+        self.entities_by_class = {}
+        self.chassis_serial_numbers = {}
+        self._resource_ids = {}
+        self._parent_relative_paths = {}
+        self.interface_mapping_table = None
+        self.alias_mapping_table = None
+        self.if_port_table = None
+        self.auto_negotiation_table = None
+        self.half_duplex_interfaces = None
+        self.ip_address_table = None
+        self.adjacent_table = None
+        self._change_markers = None
+        self._configuration_hash = None
+        self._entity_snapshot = None
+        self._entity_state = None
+        self._snmp_pipeline = None
+        self._selected_entities = None
+        self._selected_interfaces = None
+        self._entity_rows = {}
+        self._entity_tree_table = None
+        self._entity_count = None
+        self._interface_count = None
+        self._relative_path_scope = None
+        self._bulk_walk_unsupported = False
+        self._entity_classifier = None
+        self._entity_classifier_patterns = None
         self.resources = list()
         self.attributes = list()
 
+    def _reset_entity_lists(self):
+        """Drop entities sorted out by _load_entity_table
+        """
+
+        self.exclusion_list = IndexedList()
+        self.module_list = IndexedList()
+        self.chassis_list = IndexedList()
+        self.pfe_dict = {}
+        self.port_list = IndexedList()
+        self.power_supply_list = []
+        self.missing_modules_oids = {}
+
+    @property
+    def entity_classifier(self):
+        """Entity classifier compiled from the current patterns, it is taken from the process wide cache
+        once per autoload run or if any of the patterns changed, so memoized results don't outlive the run
+
+        :rtype: EricssonEntityClassifier
+        """
+
+        patterns = (self.port_exclude_pattern, self.port_ethernet_vendor_type_pattern,
+                    list(self.vendor_type_exclusion_pattern) if isinstance(self.vendor_type_exclusion_pattern, list)
+                    else self.vendor_type_exclusion_pattern, self.module_details_regexp)
+        if self._entity_classifier is None or self._entity_classifier_patterns != patterns:
+            self._entity_classifier = entity_classifier_cache.get(*patterns)
+            self._entity_classifier_patterns = patterns
+        return self._entity_classifier
+
+    def load_ericsson_mib(self):
+        """Adds Ericsson mibs to the QualiSnmp mibSources, unless the snmp handler MIB builder already has them,
+        and to the process wide MIB resolver used by GETBULK walks
+        """
+
+        self._update_mib_sources(self.snmp)
+        mib_resolver.add_mib_path(self.ERICSSON_MIB_PATH)
+
+    def _update_mib_sources(self, snmp_handler):
+        mib_builder = getattr(snmp_handler, 'mib_builder', None)
+        if mib_builder is not None and os.path.normpath(self.ERICSSON_MIB_PATH) in [
+                os.path.normpath(mib_source.fullPath()) for mib_source in mib_builder.getMibSources()]:
+            return
+        snmp_handler.update_mib_sources(self.ERICSSON_MIB_PATH)
+
+    def _create_pipeline_snmp_handler(self):
+        """Build snmp handler of a request pipeline worker, its requests are counted by the instrumentation
+        if it is enabled. Adaptive walks send numeric OIDs resolved by the process wide MIB resolver,
+        so the handler gets the same MIBs as the main snmp handler only for GETNEXT walks
+
+        :return: snmp handler
+        """
+
+        snmp_handler = self.snmp_handler_factory()
+        if not self.adaptive_walk:
+            self._update_mib_sources(snmp_handler)
+            if self.load_mib_list:
+                snmp_handler.load_mib(self.load_mib_list)
+        if self.instrumentation is not None:
+            snmp_handler = self.instrumentation.wrap(snmp_handler)
+        return snmp_handler
+
     def get_autoload_details(self):
         """General entry point for autoload,
         read device structure and attributes: chassis, modules, submodules, ports, port-channels and power supplies
 
+        If instrumentation is set, per phase statistics are sent to its sink and the autoload summary
+        is returned in the autoload_summary attribute of the result.
+
+        :return: AutoLoadDetails object
+        """
+
+        return self._run_autoload(self._get_autoload_details)
+
+    def get_selective_autoload_details(self, relative_path=None, resource_classes=None):
+        """Autoload only a part of the device, i.e. a single linecard after hot swap or only ports.
+        Only ENTITY-MIB and IF-MIB rows of the selected entities are read, with a GET request per row,
+        resource names and relative paths are the same as in the full autoload
+
+        :param relative_path: relative path of the chassis, module or port to load with everything under it, i.e. '0/1'
+        :param resource_classes: list of resource classes to load, i.e. ['ports'],
+            any of 'chassis', 'modules', 'ports', 'power_ports', 'port_channels', all of them if not provided
         :return: AutoLoadDetails object
         """
 
-        self._is_valid_device_os()
+        return self._run_autoload(self._get_selective_autoload_details, relative_path, resource_classes)
+
+    def _run_autoload(self, method, *args):
+        """Run autoload method, with the instrumented snmp handler if instrumentation is enabled
+
+        :return: AutoLoadDetails object
+        """
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return method(*args)
+
+        snmp_handler = self.snmp
+        self._snmp = instrumentation.start(snmp_handler)
+        try:
+            result = method(*args)
+        finally:
+            self._snmp = snmp_handler
+        result.autoload_summary = instrumentation.get_summary(chassis=len(self.chassis_list),
+                                                              modules=len(self.module_list),
+                                                              ports=len(self.port_list),
+                                                              power_supplies=len(self.power_supply_list))
+        return result
+
+    def _run_phase(self, name, method, *args):
+        """Run autoload phase, measure it if instrumentation is enabled
+
+        :param name: phase name used in the instrumentation records
+        :param method: phase method
+        :return: result of the phase method
+        """
+
+        if self.instrumentation is None:
+            return method(*args)
+        return self.instrumentation.run_phase(name, self.resources, self.attributes, method, *args)
+
+    def _get_autoload_details(self):
+        snapshot_key = self._start_autoload()
+        snapshot = None
+        if snapshot_key:
+            snapshot = self._run_phase('snapshot', self._load_snapshot, snapshot_key)
+        self._run_phase('device_details', self._get_device_details)
+        if snapshot is not None:
+            return self._get_cached_autoload_details(snapshot)
+        if not self._load_device_structure():
+            return AutoLoadDetails(list(), list())
+        for name, phase, args in self._get_resource_phases():
+            self._run_phase(name, phase, *args)
+
+        result = AutoLoadDetails(resources=self.resources, attributes=self.attributes)
+        if snapshot_key:
+            self._save_snapshot(snapshot_key)
+
+        self._log_autoload_result()
+        return result
+
+    def _get_selective_autoload_details(self, relative_path, resource_classes):
+        phase_names = [name for name, phase, args in self._get_resource_phases()]
+        resource_classes = list(resource_classes or phase_names)
+        unknown_classes = set(resource_classes) - set(phase_names)
+        if unknown_classes:
+            raise Exception(self.__class__.__name__,
+                            'Unknown resource classes: {0}'.format(', '.join(sorted(unknown_classes))))
+        relative_path = (relative_path or '').strip('/')
+
+        self._start_autoload(use_snapshot=False)
+        self._relative_path_scope = relative_path or None
+        if not self._load_device_structure(relative_path, resource_classes):
+            return AutoLoadDetails(list(), list())
+        for name, phase, args in self._get_resource_phases():
+            if name in resource_classes:
+                self._run_phase(name, phase, *args)
+
+        self.logger.info('Selective SNMP discovery of {0} completed'.format(
+            relative_path or ', '.join(resource_classes)))
+        self._log_autoload_result()
+        return AutoLoadDetails(resources=self.resources, attributes=self.attributes)
+
+    def _log_autoload_result(self):
+        """Log summary of the discovered structure: number of resources per model and missing linecards.
+        Full resource and attribute table is logged as a single record at result_log_level, only if it is enabled,
+        and written to result_log_path as JSON if it is set, see _get_result_log_path
+
+        :return:
+        """
+
+        resources_by_model = {}
+        for resource in self.resources:
+            resources_by_model[resource.model] = resources_by_model.get(resource.model, 0) + 1
+        self.logger.info('SNMP discovery Completed. {0} resources, {1} attributes: {2}'.format(
+            len(self.resources), len(self.attributes),
+            ', '.join('{0}: {1}'.format(model, count) for model, count in sorted(resources_by_model.iteritems()))))
+        if self.missing_modules_oids:
+            self.logger.info('The following linecards do not exist in the configuration json: {0}'.format(
+                ', '.join('{0} ({1})'.format(vendor_type_oid, description)
+                          for vendor_type_oid, description in sorted(self.missing_modules_oids.iteritems()))))
+        self.logger.info("JSON Configuration file can be found: {0}".format(self.configuration_file_path))
+
+        if self.logger.isEnabledFor(self.result_log_level):
+            lines = ['The following platform structure detected:', 'Model, Name, Relative Path, Uniqe Id']
+            lines.extend('{0},\t\t{1},\t\t{2},\t\t{3}'.format(
+                resource.model, resource.name, resource.relative_address, resource.unique_identifier)
+                for resource in self.resources)
+            lines.append('------------------------------')
+            lines.extend('{0},\t\t{1},\t\t{2}'.format(
+                attribute.relative_address, attribute.attribute_name, attribute.attribute_value)
+                for attribute in self.attributes)
+            self.logger.log(self.result_log_level, '\n'.join(lines))
+
+        if self.result_log_path:
+            result_log_path = self._get_result_log_path()
+            try:
+                with open(result_log_path, 'w') as result_file:
+                    json.dump({'resources': [[resource.model, resource.name, resource.relative_address,
+                                              resource.unique_identifier] for resource in self.resources],
+                               'attributes': [[attribute.relative_address, attribute.attribute_name,
+                                               attribute.attribute_value] for attribute in self.attributes],
+                               'missing_linecards': self.missing_modules_oids},
+                              result_file, separators=(',', ':'), default=str)
+            except (IOError, OSError) as e:
+                self.logger.warning('Failed to write autoload result to {0}: {1}'.format(result_log_path, e))
+
+    def _get_result_log_path(self):
+        """Build path of the autoload result file of the device from the result_log_path template,
+        i.e. '/var/log/autoload/{name}-{ip}.json'. Placeholders are {ip} and {port} of the device
+        and {name}, the device system name, characters which can't be used in file names are replaced with '_'.
+        If the device address is unknown {ip} is replaced with the snapshot key of the device,
+        any other text in braces is kept as is
+
+        :return: result file path
+        """
+
+        transport_address = getattr(getattr(self.snmp, 'target', None), 'transportAddr', None) or \
+            (self.snapshot_key or '', '')
+        system_name = ''
+        for attribute in self.attributes:
+            if attribute.relative_address == '' and attribute.attribute_name == 'System Name':
+                system_name = attribute.attribute_value
+                break
+        placeholders = {'ip': re.sub(r'[^\w.-]', '_', str(transport_address[0])),
+                        'port': str(transport_address[1]),
+                        'name': re.sub(r'[^\w.-]', '_', str(system_name))}
+        return re.sub(r'\{(ip|port|name)\}', lambda match: placeholders[match.group(1)], self.result_log_path)
+
+    def iter_autoload_details(self):
+        """Streaming entry point for autoload, yields AutoLoadResource and AutoLoadAttribute objects
+        as soon as every chassis, module and port is built, without collecting them in self.resources
+        and self.attributes. Snapshot store is not used in this mode.
+
+        :return: generator of AutoLoadResource and AutoLoadAttribute
+        """
+
+        snmp_handler = self.snmp
+        if self.instrumentation is not None:
+            self._snmp = self.instrumentation.start(snmp_handler)
+        try:
+            self._start_autoload(use_snapshot=False)
+            for item in self._iter_phase('device_details', self._get_device_details):
+                yield item
+            if not self._load_device_structure():
+                return
+            for name, phase, args in self._get_resource_phases():
+                for item in self._iter_phase(name, phase, *args):
+                    yield item
+            self.logger.info('SNMP discovery Completed.')
+        finally:
+            self._snmp = snmp_handler
+
+    @staticmethod
+    def collect_autoload_details(items):
+        """Collect items yielded by iter_autoload_details into AutoLoadDetails
+
+        :param items: iterable of AutoLoadResource and AutoLoadAttribute
+        :rtype: AutoLoadDetails
+        """
+
+        resources = []
+        attributes = []
+        for item in items:
+            if isinstance(item, AutoLoadResource):
+                resources.append(item)
+            else:
+                attributes.append(item)
+        return AutoLoadDetails(resources=resources, attributes=attributes)
+
+    def _start_autoload(self, use_snapshot=True):
+        """Reset state, validate device OS, load Ericsson MIBs and MIBs of load_mib_list
+
+        :param use_snapshot: whether snapshot store should be used
+        :return: device key in the snapshot store or None
+        """
+
+        self._reset_state()
+        self._run_phase('validate_os', self._is_valid_device_os)
         self.logger.info('************************************************************************')
         self.logger.info('Start SNMP discovery process .....')
-        self.load_ericsson_mib()
-        self._get_device_details()
+        self._run_phase('load_ericsson_mib', self.load_ericsson_mib)
         if self.load_mib_list:
-            self.snmp.load_mib(self.load_mib_list)
-        self._load_snmp_tables()
+            self._run_phase('load_mib', self.snmp.load_mib, self.load_mib_list)
+        return self._get_snapshot_key() if use_snapshot else None
+
+    def _load_device_structure(self, relative_path=None, resource_classes=None):
+        """Load SNMP tables, discover chassis and build entity tree
+
+        :param relative_path: relative path of the subtree to load, for selective autoload only
+        :param resource_classes: list of resource classes to load, all SNMP tables are walked if not provided
+        :return: False if no chassis was found
+        """
+
+        if resource_classes is None:
+            self._run_phase('snmp_tables', self._load_snmp_tables)
+        else:
+            self._run_phase('snmp_tables', self._load_selected_snmp_tables, relative_path, resource_classes)
         if len(self.chassis_list) < 1:
             self.logger.error('Entity table error, no chassis found')
-            return AutoLoadDetails(list(), list())
+            return False
+        self._set_chassis_relative_paths()
+        self._run_phase('entity_tree', self._build_entity_tree)
+        return True
+
+    def _set_chassis_relative_paths(self):
         for chassis in self.chassis_list:
             if chassis not in self.exclusion_list:
                 chassis_id = self._get_resource_id(chassis)
                 if chassis_id == '-1':
                     chassis_id = '0'
                 self.relative_path[chassis] = chassis_id
-        self._get_chassis_attributes(self.chassis_list)
-        self._get_module_attributes()
-        self._get_ports_attributes()
-        self._get_power_ports()
-        self._get_port_channels()
 
-        result = AutoLoadDetails(resources=self.resources, attributes=self.attributes)
+    def _get_resource_phases(self):
+        """Autoload phases which build resources, in the order they have to run
 
-        self.logger.info('*******************************************')
-        self.logger.info('SNMP discovery Completed.')
-        self.logger.info('The following platform structure detected:' +
-                         '\nModel, Name, Relative Path, Uniqe Id')
-        for resource in self.resources:
-            self.logger.info('{0},\t\t{1},\t\t{2},\t\t{3}'.format(resource.model, resource.name,
-                                                                  resource.relative_address,
-                                                                  resource.unique_identifier))
-        self.logger.info('------------------------------')
-        for attribute in self.attributes:
-            self.logger.info('{0},\t\t{1},\t\t{2}'.format(attribute.relative_address, attribute.attribute_name,
-                                                          attribute.attribute_value))
-        self.logger.info('*******************************************')
+        :return: list of (phase name, phase method, phase arguments)
+        """
 
-        self.logger.info('The following linecards do not exist in the configuration json:')
-        self.logger.info(self.missing_modules_oids)
-        self.logger.info("JSON Configuration file can be found: {0}".format(self.configuration_file_path))
-        return result
+        return [('chassis', self._get_chassis_attributes, (self.chassis_list,)),
+                ('modules', self._get_module_attributes, ()),
+                ('ports', self._get_ports_attributes, ()),
+                ('power_ports', self._get_power_ports, ()),
+                ('port_channels', self._get_port_channels, ())]
+
+    def _iter_phase(self, name, phase, *args):
+        """Run autoload phase in streaming mode, measure it if instrumentation is enabled
+
+        :return: generator of AutoLoadResource and AutoLoadAttribute built by the phase
+        """
+
+        items = self._iter_phase_items(self._get_phase_iterator(phase), *args)
+        if self.instrumentation is None:
+            return items
+        return self.instrumentation.iter_phase(name, items)
+
+    def _get_phase_iterator(self, phase):
+        """Get generator version of the phase method, if there is one, i.e. _iter_ports_attributes
+        for _get_ports_attributes
+        """
+
+        return getattr(self, phase.__name__.replace('_get_', '_iter_', 1), phase)
+
+    def _iter_phase_items(self, phase, *args):
+        """Run the phase, yield and drop resources and attributes every time the phase yields or returns
+
+        :param phase: phase method or generator method which yields after every added resource
+        """
+
+        phase_result = phase(*args)
+        for _ in phase_result if isinstance(phase_result, types.GeneratorType) else [phase_result]:
+            for resource in self.resources:
+                yield resource
+            for attribute in self.attributes:
+                yield attribute
+            del self.resources[:]
+            del self.attributes[:]
 
     def _get_entity_table(self):
         """Read Entity-MIB and filter out device's structure and all it's elements, like ports, modules, chassis, etc.
+        Reuse entity table of the previous autoload if it was not changed since then.
 
         :rtype: QualiMibTable
         :return: structured and filtered EntityPhysical table.
         """
 
+        if self._entity_snapshot is not None:
+            self.logger.info('Entity table was not changed since the previous autoload, using cached entity table')
+            entity_table = self._restore_entity_state(self._entity_snapshot)
+        else:
+            entity_table = self._load_entity_table()
+        self._entity_state = self._get_entity_state(entity_table)
+        self._map_ports(entity_table)
+        return entity_table
+
+    def _load_entity_table(self):
+        """Read Entity-MIB and sort out entities by class
+
+        :rtype: QualiMibTable
+        """
+
         result_dict = QualiMibTable('entPhysicalTable')
 
         entity_table_critical_port_attr = {'entPhysicalContainedIn': 'str', 'entPhysicalClass': 'str',
                                            'entPhysicalVendorType': 'str'}
         entity_table_optional_port_attr = {'entPhysicalDescr': 'str', 'entPhysicalName': 'str'}
 
-        physical_indexes = self.snmp.get_table('ENTITY-MIB', 'entPhysicalParentRelPos')
+        linecard_configurations = self._get_linecard_configurations()
+        classifier = self.entity_classifier
+        bulk_mode = self.bulk_mode or self._selected_entities is not None
+        if self._selected_entities is not None:
+            physical_indexes, entity_columns, vendor_type_table, vendor_type_var_binds = self._get_entity_rows(
+                self._selected_entities)
+        else:
+            physical_indexes = self._get_table('ENTITY-MIB', 'entPhysicalParentRelPos')
+            if bulk_mode:
+                entity_columns = self._get_snmp_columns('ENTITY-MIB', self.ENTITY_TABLE_COLUMNS)
+                vendor_type_table = self._walk_table('ENTITY-MIB', 'entPhysicalVendorType')
+                vendor_type_var_binds = self._get_vendor_type_var_binds()
+        if bulk_mode:
+            if physical_indexes and not entity_columns:
+                self.logger.warning('Failed to walk entPhysicalTable columns, loading entities one by one')
+                bulk_mode = False
+            else:
+                self.alias_mapping_table = self._get_alias_mapping_table()
         for index in physical_indexes.keys():
-            is_excluded = False
             if physical_indexes[index]['entPhysicalParentRelPos'] == '':
                 self.exclusion_list.append(index)
                 continue
             temp_entity_table = physical_indexes[index].copy()
-            temp_entity_table.update(self.snmp.get_properties('ENTITY-MIB', index, entity_table_critical_port_attr)
-                                     [index])
-            temp_entity_table['entPhysicalVendorType'] = self.snmp.get_property('ENTITY-MIB', 'entPhysicalVendorType',
-                                                                                index)
-            vendor_type_oid_tuple = self.snmp.var_binds[0]._ObjectType__args[-1]._ObjectIdentity__mibNode.name
+            if bulk_mode:
+                entity_row = entity_columns.get(index, dict())
+                for column_name in self.ENTITY_TABLE_COLUMNS:
+                    temp_entity_table[column_name] = entity_row.get(column_name, '')
+                temp_entity_table['entPhysicalVendorType'] = vendor_type_table.get(index, dict()).get(
+                    'entPhysicalVendorType', '')
+                vendor_type_var_bind = vendor_type_var_binds.get(index)
+            else:
+                temp_entity_table.update(self.snmp.get_properties('ENTITY-MIB', index,
+                                                                  entity_table_critical_port_attr)[index])
+                temp_entity_table['entPhysicalVendorType'] = self.snmp.get_property('ENTITY-MIB',
+                                                                                    'entPhysicalVendorType', index)
+                vendor_type_var_bind = self.snmp.var_binds[0] if self.snmp.var_binds else None
 
             if temp_entity_table['entPhysicalContainedIn'] == '':
                 self.exclusion_list.append(index)
                 continue
 
-            for item in self.vendor_type_exclusion_pattern:
-                if re.search(item, temp_entity_table['entPhysicalVendorType'].lower(), re.IGNORECASE):
-                    is_excluded = True
-                    break
-
-            if is_excluded is True:
+            entity_class = classifier.classify(temp_entity_table['entPhysicalClass'],
+                                               temp_entity_table['entPhysicalVendorType'])
+            if entity_class is None:
                 continue
 
-            temp_entity_table.update(self.snmp.get_properties('ENTITY-MIB', index, entity_table_optional_port_attr)
-                                     [index])
+            if not bulk_mode:
+                temp_entity_table.update(self.snmp.get_properties('ENTITY-MIB', index,
+                                                                  entity_table_optional_port_attr)[index])
 
-            temp_entity_table['entPhysicalClass'] = temp_entity_table['entPhysicalClass'].replace("'", "")
+            temp_entity_table['entPhysicalClass'] = entity_class
 
-            if re.search(r'stack|chassis|module|port|powerSupply|container|backplane',
-                         temp_entity_table['entPhysicalClass']):
+            if classifier.is_structure_class(entity_class):
                 result_dict[index] = temp_entity_table
 
             if temp_entity_table['entPhysicalClass'] == 'chassis':
                 self.chassis_list.append(index)
             elif temp_entity_table['entPhysicalClass'] == 'port':
-                if not re.search(self.port_exclude_pattern, temp_entity_table['entPhysicalName'], re.IGNORECASE) \
-                        and not re.search(self.port_exclude_pattern, temp_entity_table['entPhysicalDescr'],
-                                          re.IGNORECASE):
-                    port_id = self._get_mapping(index, temp_entity_table[self.ENTITY_PHYSICAL])
-                    if port_id and port_id in self.if_table and port_id not in self.port_mapping.values() \
-                            and not re.search(self.port_exclude_pattern,
-                                              self.if_table[port_id][self.IF_ENTITY], re.IGNORECASE):
-                        self.port_mapping[index] = port_id
+                if not classifier.is_excluded_port(temp_entity_table['entPhysicalName'],
+                                                   temp_entity_table['entPhysicalDescr']):
                     self.port_list.append(index)
             elif temp_entity_table['entPhysicalClass'] == 'module':
-                vendor_type_oid = '.'.join(map(str, vendor_type_oid_tuple))
-                if len(vendor_type_oid_tuple) < 11:
-                    if '.' in temp_entity_table['entPhysicalVendorType']:
-                        vendor_type_oid += '.{0}'.format(
-                            temp_entity_table['entPhysicalVendorType'].split('.')[-1])
+                vendor_type_oid = self._get_vendor_type_oid(temp_entity_table['entPhysicalVendorType'],
+                                                            vendor_type_var_bind)
                 self.module_list.append(index)
-                pfe_configuration = self.configuration.get(vendor_type_oid, None)
-                if pfe_configuration:
-                    temp_entity_table['entPhysicalModelName'] = str(pfe_configuration.get('linecard_model', ''))
-                    ignore_module = (str(pfe_configuration.get('ignore_linecard', 'False')).lower() == 'true')
-                    if ignore_module:
+                linecard_configuration = linecard_configurations.get(vendor_type_oid, None)
+                if linecard_configuration:
+                    temp_entity_table['entPhysicalModelName'] = linecard_configuration.linecard_model
+                    if linecard_configuration.ignore_linecard:
                         self.module_list.remove(index)
                         continue
-                    for pfe in pfe_configuration:
-                        if not isinstance(pfe_configuration[pfe], dict):
-                            continue
-                        pfe = pfe.encode('ascii')
-                        self.pfe_dict[index][pfe] = {}
-                        for key, values in pfe_configuration[pfe].iteritems():
-                            port_list = []
-                            port_range = list(values)
-                            for value in port_range:
-                                if '-' in value:
-                                    port_min, port_max = value.split('-')
-                                    port_list.extend(map(str, range(int(port_min), int(port_max) + 1)))
-                                else:
-                                    port_name = value.encode('ascii')
-                                    port_list.append(port_name)
-                            port_speed = key.encode('ascii')
-                            self.pfe_dict[index][pfe][port_speed] = map(str, port_list)
+                    self.pfe_dict[index] = linecard_configuration.pfe_port_map
                 else:
                     self.missing_modules_oids[vendor_type_oid] = temp_entity_table['entPhysicalDescr']
             elif temp_entity_table['entPhysicalClass'] == 'powerSupply':
@@ -196,16 +573,1015 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         self._filter_entity_table(result_dict)
         return result_dict
 
-    def _get_module_info(self, description):
-        module_details_map = {'module_model': '', 'version': '', 'serial_number': ''}
-        model_description = re.search(self.module_details_regexp, description, re.IGNORECASE)
-        if model_description:
-            result = model_description.groupdict()
-            module_details_map['module_model'] = result.get('module_model')
-            module_details_map['version'] = result.get('version')
-            module_details_map['serial_number'] = result.get('serial_number')
+    def _map_ports(self, entity_table):
+        """Map entity ports to ifTable interfaces, every interface can be mapped to a single port only
+
+        :param entity_table: entity table built by _get_entity_table
+        """
+
+        classifier = self.entity_classifier
+        for index in self.port_list:
+            port_id = self._get_mapping(index, entity_table.get(index, dict()).get(self.ENTITY_PHYSICAL, ''))
+            if port_id and port_id in self.if_table and not self.port_mapping.has_interface(port_id) \
+                    and not classifier.is_excluded_port(self.if_table[port_id][self.IF_ENTITY]):
+                self.port_mapping[index] = port_id
+
+    def _get_entity_state(self, entity_table):
+        """Copy entity table and entity lists, so they can be reused by the next autoload
+
+        :param entity_table: entity table built by _get_entity_table
+        :return: dict
+        """
+
+        entity_table_copy = QualiMibTable('entPhysicalTable')
+        for index, entity in entity_table.iteritems():
+            entity_table_copy[index] = dict(entity)
+        return {'entity_table': entity_table_copy,
+                'exclusion_list': list(self.exclusion_list),
+                'chassis_list': list(self.chassis_list),
+                'module_list': list(self.module_list),
+                'port_list': list(self.port_list),
+                'power_supply_list': list(self.power_supply_list),
+                'pfe_dict': dict(self.pfe_dict),
+                'missing_modules_oids': dict(self.missing_modules_oids),
+                'alias_mapping_table': self.alias_mapping_table}
+
+    def _restore_entity_state(self, entity_state):
+        """Restore entity lists saved by _get_entity_state
+
+        :param entity_state: dict
+        :return: entity table
+        """
+
+        self.exclusion_list = IndexedList(entity_state['exclusion_list'])
+        self.chassis_list = IndexedList(entity_state['chassis_list'])
+        self.module_list = IndexedList(entity_state['module_list'])
+        self.port_list = IndexedList(entity_state['port_list'])
+        self.power_supply_list = list(entity_state['power_supply_list'])
+        self.pfe_dict = dict(entity_state['pfe_dict'])
+        self.missing_modules_oids = dict(entity_state['missing_modules_oids'])
+        self.alias_mapping_table = entity_state['alias_mapping_table']
+        entity_table = QualiMibTable('entPhysicalTable')
+        for index, entity in entity_state['entity_table'].iteritems():
+            entity_table[index] = dict(entity)
+        return entity_table
+
+    def _get_snapshot_key(self):
+        """Get the key of the device in the snapshot store, by default it is the device address
+
+        :return: device key or None if incremental autoload is disabled
+        """
+
+        if self.snapshot_store is None:
+            return None
+        if self.snapshot_key:
+            return self.snapshot_key
+        transport_address = getattr(getattr(self.snmp, 'target', None), 'transportAddr', None)
+        if transport_address:
+            return ':'.join(map(str, transport_address))
+        self.logger.warning('Cannot identify device, incremental autoload is disabled')
+        return None
+
+    def _get_configuration_hash(self):
+        """Identify linecard configuration of the current autoload, computed once per autoload
+
+        :return: content hash of self.configuration, or path, modification time and size
+            of the configuration file, None if there is no configuration
+        """
+
+        if self._configuration_hash is None:
+            if self.configuration is not None:
+                self._configuration_hash = linecard_configuration_cache.get_hash(self.configuration)
+            elif self.configuration_file_path and os.path.exists(self.configuration_file_path):
+                file_stat = os.stat(self.configuration_file_path)
+                self._configuration_hash = (self.configuration_file_path, file_stat.st_mtime, file_stat.st_size)
+        return self._configuration_hash
+
+    def _get_snapshot_fingerprint(self, configuration_hash):
+        """Hash of all settings which affect autoload result, snapshots built with other settings are not reused
+
+        :param configuration_hash: linecard configuration identity, see _get_configuration_hash
+        """
+
+        settings = (configuration_hash, self.port_exclude_pattern, self.port_ethernet_vendor_type_pattern,
+                    self.vendor_type_exclusion_pattern, self.module_details_regexp, self.interface_mapping_mib,
+                    self.interface_mapping_key, self.load_mib_list, self.bulk_mode)
+        return hashlib.md5(repr(settings)).hexdigest()
+
+    def _get_change_markers(self):
+        """Read device uptime and the last change time of the entity, interface, LLDP neighbor
+        and port-channel tables in a single request.
+        LLDP and port-channel markers are optional, they are None if device doesn't support them
 
-        return module_details_map
+        :return: dict {'sysUpTime': int, 'bootTime': float, 'entLastChangeTime': int, 'ifTableLastChange': int,
+            'lldpStatsRemTablesLastChangeTime': int or None, 'dot3adTablesLastChanged': int or None}
+            or None if device doesn't support any of the required markers, see AutoloadSnapshot
+        """
+
+        try:
+            response = self.snmp.get(('SNMPv2-MIB', 'sysUpTime', 0), ('ENTITY-MIB', 'entLastChangeTime', 0),
+                                     ('IF-MIB', 'ifTableLastChange', 0),
+                                     ('LLDP-MIB', 'lldpStatsRemTablesLastChangeTime', 0),
+                                     ('IEEE8023-LAG-MIB', 'dot3adTablesLastChanged', 0))
+        except Exception as e:
+            self.logger.debug('Failed to read change markers: {0}'.format(e))
+            return None
+
+        result = {}
+        for name in ('sysUpTime', 'entLastChangeTime', 'ifTableLastChange'):
+            value = str(response.get(name, '')).strip()
+            if not value.isdigit():
+                self.logger.debug('Device does not support {0}, incremental autoload is disabled'.format(name))
+                return None
+            result[name] = int(value)
+        result['bootTime'] = time.time() - result['sysUpTime'] / 100.0
+        for name in ('lldpStatsRemTablesLastChangeTime', 'dot3adTablesLastChanged'):
+            value = str(response.get(name, '')).strip()
+            result[name] = int(value) if value.isdigit() else None
+        return result
+
+    def _load_snapshot(self, snapshot_key):
+        """Compare change markers of the device with the last snapshot.
+        If nothing was changed return the snapshot, if only interfaces, LLDP neighbors or port-channels were changed
+        keep entity table of the snapshot to be reused by _get_entity_table.
+        Devices don't report any change time of ifAlias and IP addresses, so their changes are not detected,
+        max_age of the snapshot store limits how long they may stay outdated
+
+        :param snapshot_key: device key in the snapshot store
+        :return: AutoloadSnapshot or None if the device has to be discovered
+        """
+
+        self._change_markers = self._get_change_markers()
+        if self._change_markers is None:
+            return None
+        snapshot = self.snapshot_store.get(snapshot_key)
+        fingerprint = self._get_snapshot_fingerprint(self._get_configuration_hash())
+        if snapshot is None or not snapshot.is_valid(fingerprint, self._change_markers):
+            self.logger.info('No valid snapshot of the device found, running full autoload')
+            return None
+        if snapshot.is_entity_changed(self._change_markers):
+            self.logger.info('Entity table was changed since the previous autoload, running full autoload')
+            return None
+        if snapshot.is_interface_changed(self._change_markers):
+            self.logger.info('Interface table was changed since the previous autoload, reloading interfaces')
+            self._entity_snapshot = snapshot.entity_state
+            return None
+        self.logger.info('Device was not changed since the previous autoload, using cached result')
+        return snapshot
+
+    def _get_cached_autoload_details(self, snapshot):
+        """Build autoload result from the snapshot, root attributes are the ones just read by _get_device_details,
+        because system name, contact, location and OS version may change without any change marker
+
+        :param snapshot: AutoloadSnapshot
+        :return: AutoLoadDetails object
+        """
+
+        root_attributes = set(attribute.attribute_name for attribute in self.attributes
+                              if attribute.relative_address == '')
+        self.resources.extend(snapshot.resources)
+        self.attributes.extend(attribute for attribute in snapshot.attributes
+                               if attribute.relative_address != '' or attribute.attribute_name not in root_attributes)
+        return AutoLoadDetails(resources=list(self.resources), attributes=list(self.attributes))
+
+    def _save_snapshot(self, snapshot_key):
+        """Store result of the autoload together with the entity state in the snapshot store
+
+        :param snapshot_key: device key in the snapshot store
+        """
+
+        if self._change_markers is None or self._entity_state is None:
+            return
+        fingerprint = self._get_snapshot_fingerprint(self._get_configuration_hash())
+        snapshot = AutoloadSnapshot(fingerprint, self._change_markers, self._entity_state,
+                                    list(self.resources), list(self.attributes))
+        try:
+            self.snapshot_store.set(snapshot_key, snapshot)
+        except Exception as e:
+            self.logger.warning('Failed to save autoload snapshot: {0}'.format(e))
+
+    def _get_linecard_configurations(self):
+        """Get compiled linecard configuration from the process wide cache.
+        Use self.configuration if it was provided, otherwise load json file from self.configuration_file_path
+
+        :return: dict {vendor type oid: LinecardConfiguration}
+        """
+
+        if self.configuration is not None:
+            return linecard_configuration_cache.get_from_dict(self.configuration, self._get_configuration_hash())
+        if self.configuration_file_path:
+            return linecard_configuration_cache.get_from_file(self.configuration_file_path)
+        return {}
+
+    def _build_entity_tree(self):
+        """Build per class index of the entity table and resolve resource ids
+        and parent relative paths of all chassis, modules, sub modules and ports at once
+
+        :return:
+        """
+
+        self.entities_by_class = {}
+        self._resource_ids = {}
+        self._parent_relative_paths = {}
+        for index, entity in self.entity_table.iteritems():
+            self.entities_by_class.setdefault(entity['entPhysicalClass'], []).append(index)
+        self.chassis_serial_numbers = self._get_chassis_serial_numbers()
+
+        chassis_set = set(self.chassis_list)
+        module_set = set(self.module_list)
+        for index in self.chassis_list + self.module_list + self.port_list:
+            if index in self.entity_table and index not in self.exclusion_list:
+                try:
+                    self._resolve_parent_relative_path(index, chassis_set, module_set)
+                except KeyError as e:
+                    self.logger.debug('Failed to resolve relative path of entity {0}: {1}'.format(index, e))
+
+        self.module_by_relative_path = {}
+        for module in self.module_list:
+            if module in self._parent_relative_paths:
+                module_id = self._parent_relative_paths[module] + '/' + self._get_resource_id(module)
+                self.module_by_relative_path[module_id] = module
+
+    def _get_entities_by_class(self, entity_class):
+        """Get indexes of all entities of the provided class
+
+        :param entity_class: entPhysicalClass value, i.e. 'backplane'
+        :return: list of entPhysicalTable indexes
+        """
+
+        return self.entities_by_class.get(entity_class, [])
+
+    def _get_chassis_serial_numbers(self):
+        """Map every chassis to the serial number of its first backplane with the serial number in description
+
+        :return: dict {chassis index: serial number}
+        """
+
+        result = {}
+        classifier = self.entity_classifier
+        backplanes = sorted(self._get_entities_by_class('backplane'),
+                            key=lambda index: int(self.entity_table[index]['entPhysicalContainedIn']))
+        for backplane in backplanes:
+            chassis = int(self.entity_table[backplane]['entPhysicalContainedIn'])
+            if chassis not in result:
+                serial_number = classifier.get_serial_number(self.entity_table[backplane]['entPhysicalDescr'])
+                if serial_number:
+                    result[chassis] = serial_number
+        return result
+
+    def _resolve_parent_relative_path(self, item_id, chassis_set, module_set):
+        """Memoized version of get_relative_path, modules get the same relative path
+        they are assigned in _get_module_attributes
+
+        :return: relative path of the item's parent
+        """
+
+        if item_id in self._parent_relative_paths:
+            return self._parent_relative_paths[item_id]
+
+        if item_id in chassis_set:
+            result = self.relative_path[item_id]
+        else:
+            parent_id = int(self.entity_table[item_id]['entPhysicalContainedIn'])
+            if parent_id in self.relative_path:
+                result = self.relative_path[parent_id]
+            else:
+                result = self._resolve_parent_relative_path(parent_id, chassis_set, module_set)
+                if parent_id in module_set and self._get_resource_id(parent_id) != '':
+                    result += '/' + self._get_resource_id(parent_id)
+        self._parent_relative_paths[item_id] = result
+        return result
+
+    def _get_resource_id(self, item_id):
+        """Gets resource relative id
+
+        :return: relative id
+        """
+
+        if item_id not in self._resource_ids:
+            self._resource_ids[item_id] = super(EricssonExtendedSNMPAutoload, self)._get_resource_id(item_id)
+        return self._resource_ids[item_id]
+
+    def get_relative_path(self, item_id):
+        """Build relative path for received item, use precomputed entity tree if possible
+
+        :param item_id:
+        :return:
+        """
+
+        if item_id in self._parent_relative_paths:
+            return self._parent_relative_paths[item_id]
+        return super(EricssonExtendedSNMPAutoload, self).get_relative_path(item_id)
+
+    def _get_snmp_columns(self, snmp_module_name, column_names, expected_rows=None, first_index=None,
+                          last_index=None):
+        """Walk each of the provided columns once and join them by index
+
+        :param snmp_module_name: MIB name, i.e. 'ENTITY-MIB'
+        :param column_names: list of column names, i.e. ['entPhysicalDescr', 'entPhysicalName']
+        :param expected_rows: expected number of rows in each column, limits GETBULK requests at the column end
+        :param first_index: index of the first row to read, see AdaptiveSnmpWalker.walk
+        :param last_index: index of the last row to read
+        :rtype: QualiMibTable
+        :return: table with all requested columns: {index: {column: value, ...}, ...}
+        """
+
+        result = QualiMibTable(snmp_module_name)
+        for column_name in column_names:
+            column_table = self._get_table(snmp_module_name, column_name, expected_rows, first_index, last_index)
+            for index, values in column_table.iteritems():
+                if index not in result:
+                    result[index] = {'suffix': values.get('suffix', str(index))}
+                result[index][column_name] = values.get(column_name, '')
+        return result
+
+    def _get_vendor_type_var_binds(self):
+        """Map entPhysicalIndex to the var bind received during the last entPhysicalVendorType walk
+
+        :return: dict {entPhysicalIndex: var_bind}
+        """
+
+        result = {}
+        if self.adaptive_walk and self._snmp_walker and not self._bulk_walk_unsupported:
+            var_binds = self._snmp_walker.var_binds
+        else:
+            var_binds = self.snmp.var_binds
+        for var_bind in var_binds:
+            try:
+                mib_name, symbol_name, indices = var_bind[0][0].getMibSymbol()
+                result[int(indices[0])] = var_bind[0]
+            except Exception as e:
+                self.logger.debug('Failed to parse entPhysicalVendorType var bind: {0}'.format(e))
+        return result
+
+    def _get_vendor_type_oid(self, vendor_type, var_bind=None):
+        """Build dotted vendor type OID of the entity, used as a key in the linecard configuration
+
+        :param vendor_type: entPhysicalVendorType value, i.e. 'RBN-PRODUCT-MIB::rbnCard.2'
+        :param var_bind: var bind received for the entPhysicalVendorType value
+        :return: vendor type OID string, i.e. '1.3.6.1.4.1.2352.5.2.2'
+        """
+
+        vendor_type_identity = var_bind[1] if var_bind is not None else None
+        if not hasattr(vendor_type_identity, 'getMibNode'):
+            for value in (vendor_type, vendor_type_identity):
+                if value is not None and re.search(r'^\.?\d+(\.\d+)+$', str(value)):
+                    return str(value).strip('.')
+            return ''
+        vendor_type_oid_tuple = tuple(vendor_type_identity.getMibNode().name)
+        vendor_type_oid = '.'.join(map(str, vendor_type_oid_tuple))
+        if len(vendor_type_oid_tuple) < 11:
+            if '.' in vendor_type:
+                vendor_type_oid += '.{0}'.format(vendor_type.split('.')[-1])
+        return vendor_type_oid
+
+    def _get_alias_mapping_table(self):
+        """Read entAliasMappingIdentifier column once for all physical entities
+
+        :return: dict {entPhysicalIndex: entAliasMappingIdentifier}
+        """
+
+        result = {}
+        if self._selected_entities is not None:
+            port_indices = ['{0}.0'.format(index) for index in sorted(self._selected_entities)
+                            if self._selected_entities[index] == 'port']
+            # ports are a part of all entities, so the entity count is an upper bound of the table size
+            alias_table = self._get_rows('ENTITY-MIB', ['entAliasMappingIdentifier'], port_indices,
+                                         self._entity_count)
+        else:
+            alias_table = self._get_table('ENTITY-MIB', 'entAliasMappingIdentifier')
+        for values in alias_table.values():
+            suffix = values.get('suffix', '').split('.')
+            if len(suffix) == 2 and suffix[0].isdigit() and suffix[1] == '0':
+                result[int(suffix[0])] = values.get('entAliasMappingIdentifier', '')
+        return result
+
+    def _get_mapping(self, port_index, port_descr):
+        """Get mapping from entPhysicalTable to ifTable.
+        Use entAliasMappingIdentifier values read in bulk if available, otherwise fall back to
+        the per-index lookup.
+
+        :return: ifTable index of the port
+        """
+
+        if self.alias_mapping_table is None:
+            return super(EricssonExtendedSNMPAutoload, self)._get_mapping(port_index, port_descr)
+
+        alias_mapping_identifier = self.alias_mapping_table.get(port_index, '')
+        if alias_mapping_identifier.split('.')[-1].isdigit():
+            return int(alias_mapping_identifier.split('.')[-1])
+
+        if_table_re = "/".join(re.findall(r'\d+', port_descr))
+        for interface in self.if_table.values():
+            if re.search(if_table_re, interface[self.IF_ENTITY]):
+                return int(interface['suffix'])
+        return None
+
+    def _load_snmp_tables(self):
+        """Load all Ericsson required snmp tables, prefetch port tables in bulk mode.
+        If max_in_flight is greater than 1 and snmp_handler_factory is provided,
+        all independent tables are walked concurrently
+
+        :return:
+        """
+
+        if self.bulk_mode and self.max_in_flight > 1 and self.snmp_handler_factory:
+            self._snmp_pipeline = SnmpRequestPipeline(self._create_pipeline_snmp_handler, self.max_in_flight,
+                                                      adaptive_walk=self.adaptive_walk)
+            for snmp_module_name, table_name in self._get_pipelined_tables():
+                self._snmp_pipeline.walk(snmp_module_name, table_name)
+        try:
+            self.logger.info('Start loading MIB tables:')
+            self.if_table = self._get_table('IF-MIB', self.IF_ENTITY)
+            self.logger.info('{0} table loaded'.format(self.IF_ENTITY))
+            self.entity_table = self._get_entity_table()
+            if len(self.entity_table.keys()) < 1:
+                raise Exception('Cannot load entPhysicalTable. Autoload cannot continue')
+            self.logger.info('Entity table loaded')
+
+            if self.interface_mapping_mib and self.interface_mapping_key:
+                self.interface_mapping_table = self._get_table(self.interface_mapping_mib, self.interface_mapping_key)
+            self.lldp_local_table = self._get_table('LLDP-MIB', 'lldpLocPortDesc')
+            self.lldp_remote_table = self._get_table('LLDP-MIB', 'lldpRemTable')
+            self.duplex_table = self._get_table('EtherLike-MIB', 'dot3StatsIndex')
+            self.ip_v4_table = self._get_table('IP-MIB', 'ipAdEntIfIndex')
+            self.ip_v6_table = self._get_table('IPV6-MIB', 'ipAdEntIfIndex')
+            self.port_channel_ports = self._get_table('IEEE8023-LAG-MIB', 'dot3adAggPortAttachedAggID')
+            self.logger.info('MIB Tables loaded successfully')
+
+            if self.bulk_mode:
+                self._prefetch_port_tables()
+        finally:
+            if self._snmp_pipeline is not None:
+                self._snmp_pipeline.close()
+                self._snmp_pipeline = None
+
+    def _get_pipelined_tables(self):
+        """Tables which don't depend on each other, in the order they are used by the autoload.
+        entPhysicalVendorType is always walked with the main snmp handler, its var binds are used to build
+        vendor type OIDs
+
+        :return: list of (MIB name, table name)
+        """
+
+        tables = [('IF-MIB', self.IF_ENTITY)]
+        if self._entity_snapshot is None:
+            tables.append(('ENTITY-MIB', 'entPhysicalParentRelPos'))
+            tables.extend(('ENTITY-MIB', column_name) for column_name in self.ENTITY_TABLE_COLUMNS)
+            tables.append(('ENTITY-MIB', 'entAliasMappingIdentifier'))
+        if self.interface_mapping_mib and self.interface_mapping_key:
+            tables.append((self.interface_mapping_mib, self.interface_mapping_key))
+        tables.extend([('LLDP-MIB', 'lldpLocPortDesc'), ('LLDP-MIB', 'lldpRemTable'),
+                       ('EtherLike-MIB', 'dot3StatsIndex'), ('IP-MIB', 'ipAdEntIfIndex'),
+                       ('IPV6-MIB', 'ipAdEntIfIndex'), ('IEEE8023-LAG-MIB', 'dot3adAggPortAttachedAggID')])
+        tables.extend(('IF-MIB', column_name) for column_name in self.IF_TABLE_PORT_ATTR.keys())
+        tables.extend([('MAU-MIB', 'ifMauAutoNegAdminStatus'), ('EtherLike-MIB', 'dot3StatsDuplexStatus')])
+        return tables
+
+    def _load_selected_snmp_tables(self, relative_path, resource_classes):
+        """Selective autoload counterpart of _load_snmp_tables. Only entPhysicalContainedIn and entPhysicalClass
+        columns are walked to find the selected entities, their ENTITY-MIB and IF-MIB rows are read with GET requests
+        or GETBULK walks of their ranges, see _get_rows. A port relative path selects only that port and its interface
+
+        :param relative_path: relative path of the subtree to load, whole device if empty
+        :param resource_classes: list of resource classes to load, i.e. ['ports']
+        :return:
+        """
+
+        self.logger.info('Start loading MIB tables for selective autoload:')
+        entity_classes = {}
+        entity_parents = {}
+        entity_children = {}
+        self._entity_tree_table = self._get_snmp_columns('ENTITY-MIB', self.SELECTIVE_TREE_COLUMNS)
+        for index, values in self._entity_tree_table.iteritems():
+            entity_classes[index] = values.get('entPhysicalClass', '').replace("'", '')
+            if values.get('entPhysicalContainedIn', '').isdigit():
+                entity_parents[index] = int(values['entPhysicalContainedIn'])
+                entity_children.setdefault(entity_parents[index], []).append(index)
+        self._entity_count = len(entity_classes)
+        if_number = self.snmp.get_property('IF-MIB', 'ifNumber', 0)
+        self._interface_count = int(if_number) if str(if_number).isdigit() else None
+
+        structure = dict((index, entity_class) for index, entity_class in entity_classes.iteritems()
+                         if entity_class in self.SELECTIVE_STRUCTURE_CLASSES)
+        candidates = entity_classes.keys()
+        if relative_path:
+            self._select_entities(structure)
+            self._set_chassis_relative_paths()
+            self._build_entity_tree()
+            root_path, root = self._get_subtree_root(relative_path)
+            if root is None:
+                self.logger.warning('No chassis or module found for relative path {0}'.format(relative_path))
+                candidates = []
+            else:
+                candidates = self._get_descendants(root, entity_children)
+                if relative_path != root_path:
+                    candidates = self._get_port_candidates(candidates, relative_path.split('/')[-1],
+                                                           entity_classes, entity_parents)
+
+        selected_classes = set(self.SELECTIVE_ENTITY_CLASSES[resource_class] for resource_class in resource_classes
+                               if resource_class in self.SELECTIVE_ENTITY_CLASSES)
+        selected_entities = dict(structure)
+        selected_entities.update((index, entity_classes[index]) for index in candidates
+                                 if entity_classes[index] in selected_classes)
+        self._select_entities(selected_entities)
+        self.logger.info('{0} of {1} entities selected'.format(len(selected_entities), len(entity_classes)))
+
+        interfaces = set()
+        for alias_mapping_identifier in self.alias_mapping_table.values():
+            if alias_mapping_identifier.split('.')[-1].isdigit():
+                interfaces.add(int(alias_mapping_identifier.split('.')[-1]))
+        if 'port_channels' in resource_classes:
+            self.port_channel_ports = self._get_table('IEEE8023-LAG-MIB', 'dot3adAggPortAttachedAggID')
+            interfaces.update(index for index, values in self._get_table('IF-MIB', 'ifType').iteritems()
+                              if 'ieee8023adLag' in values.get('ifType', ''))
+            interfaces.update(self.port_channel_ports.keys())
+        else:
+            self.port_channel_ports = QualiMibTable('dot3adAggPortAttachedAggID')
+        self._selected_interfaces = sorted(interfaces)
+        self.if_table = self._get_interface_columns('IF-MIB', [self.IF_ENTITY] + self.IF_TABLE_PORT_ATTR.keys())
+        self._map_ports(self.entity_table)
+
+        if self.interface_mapping_mib and self.interface_mapping_key:
+            self.interface_mapping_table = self._get_table(self.interface_mapping_mib, self.interface_mapping_key)
+        if 'ports' in resource_classes:
+            self.lldp_local_table = self._get_table('LLDP-MIB', 'lldpLocPortDesc')
+            self.lldp_remote_table = self._get_table('LLDP-MIB', 'lldpRemTable')
+        else:
+            self.lldp_local_table = QualiMibTable('lldpLocPortDesc')
+            self.lldp_remote_table = QualiMibTable('lldpRemTable')
+        if 'ports' in resource_classes or 'port_channels' in resource_classes:
+            self.ip_v4_table = self._get_table('IP-MIB', 'ipAdEntIfIndex')
+            self.ip_v6_table = self._get_table('IPV6-MIB', 'ipAdEntIfIndex')
+        else:
+            self.ip_v4_table = QualiMibTable('ipAdEntIfIndex')
+            self.ip_v6_table = QualiMibTable('ipAdEntIfIndex')
+        self.duplex_table = self._get_interface_columns('EtherLike-MIB', ['dot3StatsIndex'])
+        self.logger.info('MIB Tables loaded successfully')
+        self._prefetch_port_tables()
+
+    def _select_entities(self, selected_entities):
+        """Load entity table from the rows of the provided entities only
+
+        :param selected_entities: dict {entPhysicalIndex: entity class}
+        """
+
+        self._reset_entity_lists()
+        self._selected_entities = selected_entities
+        self.entity_table = self._load_entity_table()
+
+    def _get_subtree_root(self, relative_path):
+        """Find chassis or module with the longest relative path which is equal to or contains the provided one
+
+        :param relative_path: relative path, i.e. '0/1/0/5'
+        :return: tuple (relative path, entPhysicalIndex) of the chassis or module, (None, None) if there is no such
+        """
+
+        entities_by_path = dict(self.module_by_relative_path)
+        entities_by_path.update((self.relative_path[chassis], chassis) for chassis in self.chassis_list
+                                if chassis in self.relative_path)
+        for path in sorted(entities_by_path, key=len, reverse=True):
+            if relative_path == path or relative_path.startswith(path + '/'):
+                return path, entities_by_path[path]
+        return None, None
+
+    def _get_port_candidates(self, candidates, port_id, entity_classes, entity_parents):
+        """Narrow entities under the subtree root to the ports with the resource id of the requested port path,
+        reading only entPhysicalParentRelPos of the ports and of their containers, see _get_resource_id
+
+        :param candidates: list of entPhysicalIndex of the entities under the subtree root
+        :param port_id: last part of the requested relative path, i.e. '5' for '0/1/0/5'
+        :param entity_classes: dict {entPhysicalIndex: entity class}
+        :param entity_parents: dict {entPhysicalIndex: entPhysicalContainedIn}
+        :return: list of entPhysicalIndex, all candidates if no port matched
+        """
+
+        ports = [index for index in candidates if entity_classes[index] == 'port']
+        containers = dict((port, entity_parents[port]) for port in ports
+                          if entity_classes.get(entity_parents.get(port)) in ('container', 'backplane'))
+        positions = self._get_rows('ENTITY-MIB', ['entPhysicalParentRelPos'],
+                                   sorted(set(ports) | set(containers.values())), self._entity_count)
+        result = [port for port in ports
+                  if positions.get(containers.get(port, port), {}).get('entPhysicalParentRelPos') == port_id]
+        if not result:
+            self.logger.debug('No port with id {0} found, loading all ports of the subtree'.format(port_id))
+            return candidates
+        return result
+
+    @staticmethod
+    def _get_descendants(root, entity_children):
+        """Get indexes of all entities contained in the root entity, directly or not
+
+        :param entity_children: dict {entPhysicalIndex: list of indexes of contained entities}
+        """
+
+        result = []
+        pending = [root]
+        while pending:
+            children = entity_children.get(pending.pop(), [])
+            result.extend(children)
+            pending.extend(children)
+        return result
+
+    def _get_entity_rows(self, indices):
+        """Read entPhysicalTable rows of the provided entities, see _get_rows,
+        rows already read during the current autoload are reused
+
+        :param indices: list of entPhysicalTable indexes
+        :return: tuple (entPhysicalParentRelPos table, ENTITY_TABLE_COLUMNS table, entPhysicalVendorType table,
+            dict {entPhysicalIndex: entPhysicalVendorType var bind}) in the same format as the walked ones
+        """
+
+        column_names = ['entPhysicalParentRelPos'] + self.ENTITY_TABLE_COLUMNS + ['entPhysicalVendorType']
+        physical_indexes = QualiMibTable('entPhysicalParentRelPos')
+        entity_columns = QualiMibTable('ENTITY-MIB')
+        vendor_type_table = QualiMibTable('entPhysicalVendorType')
+        vendor_type_var_binds = {}
+        missing_indices = sorted(index for index in indices if index not in self._entity_rows)
+        if missing_indices:
+            # columns walked to select the entities are not read again
+            tree_table = self._entity_tree_table or {}
+            read_column_names = [column_name for column_name in column_names
+                                 if not tree_table or column_name not in self.SELECTIVE_TREE_COLUMNS]
+            missing_var_binds = {}
+            rows = self._get_rows('ENTITY-MIB', read_column_names, missing_indices, self._entity_count,
+                                  missing_var_binds)
+            for index in missing_indices:
+                row = dict(tree_table.get(index, {}))
+                row.update(rows.get(index, {}))
+                self._entity_rows[index] = (dict((column_name, row.get(column_name, ''))
+                                                 for column_name in column_names), missing_var_binds.get(index))
+        for index in sorted(indices):
+            row, vendor_type_var_binds[index] = self._entity_rows[index]
+            physical_indexes[index] = {'suffix': str(index),
+                                       'entPhysicalParentRelPos': row['entPhysicalParentRelPos']}
+            entity_columns[index] = dict((column_name, row[column_name])
+                                         for column_name in self.ENTITY_TABLE_COLUMNS)
+            entity_columns[index]['suffix'] = str(index)
+            vendor_type_table[index] = {'suffix': str(index), 'entPhysicalVendorType': row['entPhysicalVendorType']}
+        return physical_indexes, entity_columns, vendor_type_table, vendor_type_var_binds
+
+    def _get_interface_columns(self, snmp_module_name, column_names, index_suffix='', expected_rows=None):
+        """Walk ifIndex indexed columns, or read only rows of the selected interfaces during selective autoload
+
+        :param snmp_module_name: MIB name, i.e. 'IF-MIB'
+        :param column_names: list of column names, i.e. ['ifName', 'ifAlias']
+        :param index_suffix: part of the row index after ifIndex, i.e. '.1' for ifMauAutoNegAdminStatus
+        :param expected_rows: expected number of rows in each walked column
+        :rtype: QualiMibTable
+        """
+
+        if self._selected_interfaces is None:
+            return self._get_snmp_columns(snmp_module_name, column_names, expected_rows)
+        return self._get_rows(snmp_module_name, column_names,
+                              ['{0}{1}'.format(index, index_suffix) for index in self._selected_interfaces],
+                              self._interface_count)
+
+    def _get_rows(self, snmp_module_name, column_names, indices, table_rows=None, vendor_type_var_binds=None):
+        """Read the provided columns of the provided table rows with as few requests as possible,
+        with GET requests, GETBULK walks of row ranges or walks of the whole columns, see _get_row_reads
+
+        :param snmp_module_name: MIB name, i.e. 'IF-MIB'
+        :param column_names: list of column names, i.e. ['ifName', 'ifAlias']
+        :param indices: list of row indexes, i.e. [1, 2] or ['1.0', '2.0']
+        :param table_rows: number of rows in the whole table, the whole columns are never walked if it's not known
+        :param vendor_type_var_binds: dict to fill with {entPhysicalIndex: var bind of the last column},
+            the last column has to be entPhysicalVendorType
+        :rtype: QualiMibTable
+        :return: table in the same format as _get_snmp_columns, rows without any value are skipped
+        """
+
+        result = QualiMibTable(snmp_module_name)
+        rows = []
+        row_indices, row_ranges = self._get_row_reads(indices, len(column_names), table_rows)
+        for index in row_indices:
+            rows.append((str(index), self._get_row(snmp_module_name, column_names, index)))
+            if vendor_type_var_binds is not None and self.snmp.var_binds:
+                vendor_type_var_binds[int(index)] = self.snmp.var_binds[-1]
+        selected_indices = set(str(index) for index in indices)
+        for first_index, last_index, expected_rows in row_ranges:
+            table = self._get_snmp_columns(snmp_module_name, column_names, expected_rows, first_index, last_index)
+            if vendor_type_var_binds is not None:
+                vendor_type_var_binds.update(self._get_vendor_type_var_binds())
+            rows.extend((values['suffix'], dict((column_name, values.get(column_name, ''))
+                                                for column_name in column_names))
+                        for values in table.values() if values.get('suffix') in selected_indices)
+        for index, row in rows:
+            if any(row.values()):
+                row['suffix'] = index
+                result[int(index) if index.isdigit() else index] = row
+        return result
+
+    def _get_row_reads(self, indices, column_count, table_rows=None):
+        """Plan how to read the selected table rows. A GET request reads all columns of a row and a GETBULK
+        walk reads about max-repetitions rows of a column, so the selected rows are split into ranges of close
+        indexes, each range is read with whichever takes less requests, and the whole columns are walked instead
+        if that takes less requests than all the ranges. Rows are always read with GET requests if tables
+        are walked with GETNEXT
+
+        :param indices: list of row indexes, i.e. [1, 2] or ['1.0', '2.0']
+        :param column_count: number of read columns
+        :param table_rows: number of rows in the whole table, None if not known
+        :return: tuple (list of indexes to read with GET requests,
+            list of tuples (first index, last index, expected rows) to walk, indexes are None for the whole columns)
+        """
+
+        if not self.adaptive_walk or self._bulk_walk_unsupported or not indices:
+            return list(indices), []
+
+        max_repetitions = self._get_snmp_walker().max_repetitions
+        index_ranges = []
+        for index in sorted(indices, key=lambda index: tuple(int(part) for part in str(index).split('.'))):
+            first_part = int(str(index).split('.')[0])
+            if index_ranges and first_part - index_ranges[-1][-1][0] <= self.SELECTIVE_INDEX_GAP:
+                index_ranges[-1].append((first_part, index))
+            else:
+                index_ranges.append([(first_part, index)])
+
+        row_indices = []
+        row_ranges = []
+        request_count = 0
+        for index_range in index_ranges:
+            walk_request_count = column_count * (len(index_range) // max_repetitions + 1)
+            if walk_request_count < len(index_range):
+                row_ranges.append((index_range[0][1], index_range[-1][1], len(index_range)))
+                request_count += walk_request_count
+            else:
+                row_indices.extend(index for first_part, index in index_range)
+                request_count += len(index_range)
+        if table_rows and column_count * (table_rows // max_repetitions + 1) < request_count:
+            return [], [(None, None, table_rows)]
+        return row_indices, row_ranges
+
+    def _get_row(self, snmp_module_name, column_names, index):
+        """Read the provided columns of a single table row with one GET request,
+        fall back to a request per column if the agent rejects the whole request
+
+        :return: dict {column name: value}, missing values are empty strings
+        """
+
+        index_list = tuple(str(index).split('.'))
+        try:
+            values = self.snmp.get(*[(snmp_module_name, column_name) + index_list for column_name in column_names])
+        except Exception as e:
+            self.logger.debug('Failed to read {0} row {1} at once: {2}'.format(snmp_module_name, index, e))
+            return dict((column_name, self.snmp.get_property(snmp_module_name, column_name, str(index)))
+                        for column_name in column_names)
+        result = {}
+        for column_name in column_names:
+            value = values.get(column_name, '')
+            result[column_name] = '' if value.startswith('No Such') else value
+        return result
+
+    def _get_table(self, snmp_module_name, table_name, expected_rows=None, first_index=None, last_index=None):
+        """Get table walked by the request pipeline, walk it with the main snmp handler if it wasn't scheduled
+
+        :param expected_rows: expected number of rows if the table is walked with the main snmp handler
+        :param first_index: index of the first row to walk, ranges are always walked with the main snmp handler
+        :param last_index: index of the last row to walk
+        :rtype: QualiMibTable
+        """
+
+        if self._snmp_pipeline is not None and first_index is None and last_index is None and \
+                self._snmp_pipeline.is_scheduled(snmp_module_name, table_name):
+            try:
+                table, wall_time, request_count = self._snmp_pipeline.get_table(snmp_module_name, table_name)
+            except Exception as e:
+                self.logger.warning('Concurrent walk of {0}::{1} failed: {2}'.format(snmp_module_name, table_name, e))
+            else:
+                if self.instrumentation is not None and request_count is not None:
+                    self.instrumentation.snmp_handler.record('walk', '{0}::{1}'.format(snmp_module_name, table_name),
+                                                             wall_time, request_count)
+                return table
+        return self._walk_table(snmp_module_name, table_name, expected_rows, first_index, last_index)
+
+    def _walk_table(self, snmp_module_name, table_name, expected_rows=None, first_index=None, last_index=None):
+        """Walk the table with the main snmp handler, with adaptively sized GETBULK requests if adaptive_walk is set.
+        Walker keeps learned max-repetitions and timeout while the snmp handler stays the same.
+        If the snmp handler can't send GETBULK requests, tables are walked with GETNEXT till the end of the autoload,
+        GETNEXT walks ignore the row range and read the whole table
+
+        :param expected_rows: expected number of rows, see AdaptiveSnmpWalker.walk
+        :param first_index: index of the first row to walk
+        :param last_index: index of the last row to walk
+        :rtype: QualiMibTable
+        """
+
+        if not self.adaptive_walk or self._bulk_walk_unsupported:
+            return self.snmp.get_table(snmp_module_name, table_name)
+
+        snmp_walker = self._get_snmp_walker()
+        start_time = time.time()
+        request_count = snmp_walker.request_count
+        try:
+            table = snmp_walker.walk(snmp_module_name, table_name, expected_rows, first_index, last_index)
+        except SnmpRequestTimeout as e:
+            self.logger.error('Failed to walk {0}::{1}: {2}'.format(snmp_module_name, table_name, e))
+            snmp_walker.var_binds = []
+            table = QualiMibTable(table_name)
+        except Exception as e:
+            self.logger.warning('GETBULK walk of {0}::{1} failed, walking with GETNEXT: {2}'.format(
+                snmp_module_name, table_name, e))
+            self._bulk_walk_unsupported = True
+            return self.snmp.get_table(snmp_module_name, table_name)
+        if self.instrumentation is not None:
+            self.instrumentation.snmp_handler.record('walk', '{0}::{1}'.format(snmp_module_name, table_name),
+                                                     time.time() - start_time,
+                                                     snmp_walker.request_count - request_count)
+        return table
+
+    def _get_snmp_walker(self):
+        """Get GETBULK walker of the main snmp handler, created again if the snmp handler was replaced
+
+        :rtype: AdaptiveSnmpWalker
+        """
+
+        if self._snmp_walker is None or self._snmp_walker.snmp_handler is not self.snmp:
+            self._snmp_walker = AdaptiveSnmpWalker(self.snmp)
+        return self._snmp_walker
+
+    def _prefetch_port_tables(self):
+        """Read all port related IF-MIB, MAU-MIB and EtherLike-MIB columns once
+        and index IP addresses and LLDP neighbors by ifTable index,
+        so ports can be built without any per-port SNMP requests
+
+        :return:
+        """
+
+        self.logger.info('Start prefetching port tables')
+        # port columns have a row per interface or per ethernet interface, so GETBULK walks of them
+        # can stop at the end of the column instead of reading max-repetitions var binds of the next one
+        if self._selected_interfaces is None:
+            self.if_port_table = self._get_snmp_columns('IF-MIB', self.IF_TABLE_PORT_ATTR.keys(), len(self.if_table))
+        else:
+            self.if_port_table = self.if_table
+
+        self.auto_negotiation_table = {}
+        auto_negotiation_table = self._get_interface_columns('MAU-MIB', ['ifMauAutoNegAdminStatus'], '.1',
+                                                             expected_rows=len(self.duplex_table))
+        for values in auto_negotiation_table.values():
+            suffix = values.get('suffix', '').split('.')
+            if len(suffix) == 2 and suffix[0].isdigit() and suffix[1] == '1':
+                self.auto_negotiation_table[int(suffix[0])] = values.get('ifMauAutoNegAdminStatus', '')
+
+        self.half_duplex_interfaces = set()
+        if self.duplex_table:
+            duplex_status_table = self._get_interface_columns('EtherLike-MIB', ['dot3StatsDuplexStatus'],
+                                                              expected_rows=len(self.duplex_table))
+            for key, value in self.duplex_table.iteritems():
+                duplex_status = duplex_status_table.get(key, dict()).get('dot3StatsDuplexStatus', '')
+                if 'dot3StatsIndex' in value and 'halfDuplex' in duplex_status:
+                    self.half_duplex_interfaces.add(value['dot3StatsIndex'])
+
+        self.ip_address_table = self._get_ip_address_table()
+        self.adjacent_table = self._get_adjacent_table()
+        self.logger.info('Port tables prefetched')
+
+    def _get_ip_address_table(self):
+        """Index IPv4 and IPv6 addresses by ifTable index
+
+        :return: dict {ifTable index: {'ipv4_address': '', 'ipv6_address': ''}}
+        """
+
+        result = {}
+        if not self.interface_mapping_table:
+            return result
+
+        interface_ids = {}
+        for key, value in self.interface_mapping_table.iteritems():
+            if self.interface_mapping_key in value and value[self.interface_mapping_key] not in interface_ids:
+                interface_ids[value[self.interface_mapping_key]] = int(str(key).split('.')[0])
+
+        addresses = {}
+        for address_type, ip_table in (('ipv4_address', self.ip_v4_table), ('ipv6_address', self.ip_v6_table)):
+            addresses[address_type] = {}
+            if not ip_table or len(ip_table) < 2:
+                continue
+            for key, value in ip_table.iteritems():
+                if 'ipAdEntIfIndex' in value and int(value['ipAdEntIfIndex']) not in addresses[address_type]:
+                    addresses[address_type][int(value['ipAdEntIfIndex'])] = key
+
+        for port_index, interface_id in interface_ids.iteritems():
+            if interface_id:
+                result[port_index] = {'ipv4_address': addresses['ipv4_address'].get(interface_id, ''),
+                                      'ipv6_address': addresses['ipv6_address'].get(interface_id, '')}
+        return result
+
+    def _get_adjacent_table(self):
+        """Match LLDP neighbors to all mapped interfaces at once.
+        lldpRemTable rows are indexed by lldpRemTimeMark.lldpRemLocalPortNum.lldpRemIndex,
+        lldpLocPortTable rows by lldpLocPortNum.
+        Interface name matches a local port if it is equal to the port description or is a separate word of it,
+        i.e. '1/1' matches 'ethernet 1/1' but not 'ethernet 1/10', the port with the lowest number wins
+
+        :return: dict {ifTable index: adjacent device name and port}
+        """
+
+        result = {}
+        if not self.lldp_remote_table or not self.lldp_local_table:
+            return result
+
+        remote_ports = {}
+        for key, value in self.lldp_remote_table.iteritems():
+            if 'lldpRemSysName' not in value or 'lldpRemPortDesc' not in value:
+                continue
+            index = str(value.get('suffix', key)).split('.')
+            local_port = int(index[1]) if len(index) == 3 and index[1].isdigit() else key
+            remote_ports[local_port] = '{0} through {1}'.format(value['lldpRemSysName'], value['lldpRemPortDesc'])
+
+        neighbors = []
+        for key in sorted(self.lldp_local_table):
+            port_description = self.lldp_local_table[key].get('lldpLocPortDesc', '')
+            if port_description and key in remote_ports:
+                neighbors.append((port_description, remote_ports[key]))
+        if not neighbors:
+            return result
+        exact_neighbors = {}
+        for port_description, adjacent in neighbors:
+            exact_neighbors.setdefault(port_description, adjacent)
+
+        for interface_id in set(self.port_mapping.values()):
+            interface_name = self.if_table.get(interface_id, dict()).get(self.IF_ENTITY, '')
+            if interface_name == '':
+                continue
+            if interface_name in exact_neighbors:
+                result[interface_id] = exact_neighbors[interface_name]
+                continue
+            # port description may contain the interface name along with other text
+            interface_name_re = re.compile(r'(?<![\w/.]){0}(?![\w/.])'.format(re.escape(interface_name)))
+            for port_description, adjacent in neighbors:
+                if interface_name_re.search(port_description):
+                    result[interface_id] = adjacent
+                    break
+        return result
+
+    def _get_if_port_details(self, port_index):
+        """Get IF-MIB attributes of the port, from the prefetched table if available
+
+        :param port_index: port index in ifTable
+        :return: dict {'ifName': '', 'ifAlias': '', 'ifType': '', 'ifPhysAddress': '', 'ifMtu': 0, 'ifHighSpeed': 0}
+        """
+
+        if self.if_port_table is None:
+            return self.snmp.get_properties('IF-MIB', port_index, self.IF_TABLE_PORT_ATTR)[port_index]
+
+        result = {}
+        port_details = self.if_port_table.get(port_index, dict())
+        for key, value_type in self.IF_TABLE_PORT_ATTR.iteritems():
+            value = port_details.get(key, '').strip(' \t\n\r')
+            if 'int' in value_type:
+                try:
+                    value = int(value)
+                except ValueError:
+                    value = 0
+            result[key] = value
+        return result
+
+    def _get_ip_interface_details(self, port_index):
+        """Get IP address details for provided port
+
+        :param port_index: port index in ifTable
+        :return interface_details: detected info for provided interface dict{'IPv4 Address': '', 'IPv6 Address': ''}
+        """
+
+        if self.ip_address_table is None:
+            return super(EricssonExtendedSNMPAutoload, self)._get_ip_interface_details(port_index)
+        return dict(self.ip_address_table.get(str(port_index), {'ipv4_address': '', 'ipv6_address': ''}))
+
+    def _get_adjacent(self, interface_id):
+        """Get connected device interface and device name to the specified port id.
+        Neighbors are matched by _get_adjacent_table in every mode, in legacy mode on the first call,
+        the base class lookup never found any because it checked column names against lldpRemTable row indexes
+
+        :param interface_id: port id
+        :return: device's name and port connected to port id
+        :rtype string
+        """
+
+        if self.adjacent_table is None:
+            self.adjacent_table = self._get_adjacent_table()
+        return self.adjacent_table.get(interface_id, '')
+
+    def _get_interface_details(self, port_index):
+        """Get interface auto negotiation and duplex attributes
+
+        :param port_index: port index in entPhysicalTable
+        :return interface_details: detected info for provided interface dict{'Auto Negotiation': '', 'Duplex': ''}
+        """
+
+        if self.auto_negotiation_table is None:
+            return super(EricssonExtendedSNMPAutoload, self)._get_interface_details(port_index)
+
+        interface_details = {'duplex': 'Full', 'auto_negotiation': 'False'}
+        if port_index in self.port_mapping:
+            if 'enabled' in self.auto_negotiation_table.get(self.port_mapping[port_index], '').lower():
+                interface_details['auto_negotiation'] = 'True'
+            if str(self.port_mapping[port_index]) in self.half_duplex_interfaces:
+                interface_details['duplex'] = 'Half'
+        return interface_details
+
+    def _get_module_info(self, description):
+        return self.entity_classifier.get_module_info(description)
 
     def _add_resource(self, resource):
         """Add object data to resources and attributes lists
@@ -213,6 +1589,9 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         :param resource: object which contains all required data for certain resource
         """
 
+        if self._relative_path_scope and resource.relative_path != self._relative_path_scope \
+                and not resource.relative_path.startswith(self._relative_path_scope + '/'):
+            return
         self.resources.append(resource.get_autoload_resource_details())
         self.attributes.extend(resource.get_autoload_resource_attributes())
 
@@ -222,12 +1601,20 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         :return:
         """
 
+        for _ in self._iter_module_attributes():
+            pass
+
+    def _iter_module_attributes(self):
+        """Set attributes for all discovered modules, yield after every added module and PFE
+        """
+
         self.logger.info('Start loading Modules')
+        log_items = self.logger.isEnabledFor(logging.DEBUG)
         for module in self.module_list:
-            module_id = self.get_relative_path(module) + '/' + self._get_resource_id(module)
+            module_index = self._get_resource_id(module)
+            module_id = self.get_relative_path(module) + '/' + module_index
             self.relative_path[module] = module_id
             self.module_by_relative_path[module_id] = module
-            module_index = self._get_resource_id(module)
             module_entity = self.entity_table.get(module, dict())
             ericsson_model = module_entity.get('entPhysicalModelName', '')
             module_details_map = self._get_module_info(module_entity['entPhysicalDescr'])
@@ -235,20 +1622,25 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
                 module_details_map['ericsson_model'] = ericsson_model
                 module_details_map['module_model'] = ericsson_model
             else:
-                module_details_map['ericsson_model'] = re.sub('\s[Cc]ard.*$', '', module_details_map['module_model'])
+                module_details_map['ericsson_model'] = self.entity_classifier.get_module_model(
+                    module_details_map['module_model'])
             module_name = "Card {0} - {1}".format(module_index, module_details_map.get('module_model', ''))
             if '/' in module_id and len(module_id.split('/')) < 3:
                 model = 'Generic Module'
             else:
                 model = 'Generic Sub Module'
-            module_object = EricssonModule(name=module_name, model=model, relative_path=module_id, **module_details_map)
+            module_object = CompactEricssonModule(name=module_name, model=model, relative_path=module_id,
+                                                  **module_details_map)
             self._add_resource(module_object)
-            self.logger.info('Module {} added'.format(self.entity_table[module]['entPhysicalDescr']))
-            pfes = self.pfe_dict.get(module, dict())
-            for pfe_key in pfes.keys():
-                pfe_object = PFE(name=pfe_key.upper().replace('_', ''),
-                                 relative_path="{0}/{1}".format(module_id, pfe_key.split('_')[-1]))
+            if log_items:
+                self.logger.debug('Module {} added'.format(self.entity_table[module]['entPhysicalDescr']))
+            yield
+            pfe_map = self.pfe_dict.get(module)
+            for pfe_key in pfe_map.pfe_names if pfe_map else []:
+                pfe_object = CompactPFE(name=pfe_key.upper().replace('_', ''),
+                                        relative_path="{0}/{1}".format(module_id, pfe_key.split('_')[-1]))
                 self._add_resource(pfe_object)
+                yield
         self.logger.info('Load modules completed.')
 
     def _get_ports_attributes(self):
@@ -257,7 +1649,16 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         :return:
         """
 
+        for _ in self._iter_ports_attributes():
+            pass
+
+    def _iter_ports_attributes(self):
+        """Get resource details and attributes for every port in self.port_list, yield after every added port
+        """
+
         self.logger.info('Load Ports:')
+        classifier = self.entity_classifier
+        log_items = self.logger.isEnabledFor(logging.DEBUG)
         for port in self.port_list:
             if port in self.exclusion_list:
                 continue
@@ -268,56 +1669,40 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
             port_id = self._get_resource_id(port)
             parent_relative_path = self.get_relative_path(port)
             parent_entity_id = self.module_by_relative_path.get(parent_relative_path, '')
-            if parent_entity_id:
-                pfe_config = self.pfe_dict.get(parent_entity_id, list())
-                for port_config in pfe_config:
-                    has_pfe_config = False
-                    for key, values in pfe_config[port_config].iteritems():
-                        if port_id in values:
-                            if '1GE' in key:
-                                does_support_1ge = True
-                            if '10GE' in key:
-                                does_support_10ge = True
-                            if '40GE' in key:
-                                does_support_40ge = True
-                            if '100GE' in key:
-                                does_support_100ge = True
-                            has_pfe_config = True
-                    if has_pfe_config:
-                        parent_relative_path = parent_relative_path + '/' + port_config.replace('pfe_', '')
+            pfe_map = self.pfe_dict.get(parent_entity_id) if parent_entity_id else None
+            if pfe_map:
+                for port_config, port_speeds in pfe_map.get_port_pfes(port_id):
+                    for key in port_speeds:
+                        if '1GE' in key:
+                            does_support_1ge = True
+                        if '10GE' in key:
+                            does_support_10ge = True
+                        if '40GE' in key:
+                            does_support_40ge = True
+                        if '100GE' in key:
+                            does_support_100ge = True
+                    parent_relative_path = parent_relative_path + '/' + port_config.replace('pfe_', '')
 
             port_relative_path = parent_relative_path + '/' + port_id
             attribute_map = {}
-            interface_name = self.entity_table[port]['entPhysicalDescr'].lower()
-            if self.port_ethernet_vendor_type_pattern != '' and re.search(self.port_ethernet_vendor_type_pattern,
-                                                                          self.entity_table[port][
-                                                                              'entPhysicalVendorType'], re.IGNORECASE):
-                interface_name = re.sub(r'.*unknown', 'ethernet', interface_name)
-            match_data = re.search('.*(\d+/)+?\d+', interface_name)
-            if match_data:
-                interface_name = match_data.group()
-
-            if port in self.port_mapping.keys() and self.port_mapping[port] in self.if_table:
-                if_table_port_attr = {'ifType': 'str', 'ifPhysAddress': 'str', 'ifMtu': 'int', 'ifHighSpeed': 'int'}
-                if_table = self.if_table[self.port_mapping[port]].copy()
-                if_table.update(self.snmp.get_properties('IF-MIB', self.port_mapping[port], if_table_port_attr))
-                interface_name = self.snmp.get_property('IF-MIB', 'ifName', self.port_mapping[port]).replace("'",
-                                                                                                             '').lower()
-                interface_type = if_table[self.port_mapping[port]]['ifType'].replace('/', '').replace("'", '')
+            interface_name = classifier.get_entity_port_name(self.entity_table[port]['entPhysicalDescr'],
+                                                             self.entity_table[port]['entPhysicalVendorType'])
+
+            if port in self.port_mapping and self.port_mapping[port] in self.if_table:
+                if_port_details = self._get_if_port_details(self.port_mapping[port])
+                interface_name = if_port_details['ifName'].replace("'", '').lower()
+                interface_type = if_port_details['ifType'].replace('/', '').replace("'", '')
                 attribute_map = {'l2_protocol_type': interface_type,
-                                 'mac': if_table[self.port_mapping[port]]['ifPhysAddress'],
-                                 'mtu': if_table[self.port_mapping[port]]['ifMtu'],
-                                 'bandwidth': if_table[self.port_mapping[port]]['ifHighSpeed'],
-                                 'description': self.snmp.get_property('IF-MIB', 'ifAlias', self.port_mapping[port]),
+                                 'mac': if_port_details['ifPhysAddress'],
+                                 'mtu': if_port_details['ifMtu'],
+                                 'bandwidth': if_port_details['ifHighSpeed'],
+                                 'description': if_port_details['ifAlias'],
                                  'adjacent': self._get_adjacent(self.port_mapping[port])}
                 attribute_map.update(self._get_ip_interface_details(self.port_mapping[port]))
 
             attribute_map.update(self._get_interface_details(port))
 
-            interface_name_match = re.search(r'^(?P<port>port)\s*(?P<name>\S+)\s*(?P<id>(\d+/)?\d+)', interface_name)
-            if interface_name_match:
-                name_dict = interface_name_match.groupdict()
-                interface_name = '{0} {1} {2}'.format(name_dict['name'], name_dict['port'], name_dict['id'])
+            interface_name = classifier.normalize_port_name(interface_name)
 
             if 'l2_protocol_type' not in attribute_map.keys():
                 attribute_map['l2_protocol_type'] = ''
@@ -330,10 +1715,12 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
             attribute_map['supports_40ge'] = does_support_40ge
             attribute_map['supports_100ge'] = does_support_100ge
 
-            port_object = EricssonPort(name=interface_name.replace('/', '-').title(), relative_path=port_relative_path,
-                                       **attribute_map)
+            port_object = CompactEricssonPort(name=interface_name.replace('/', '-').title(),
+                                              relative_path=port_relative_path, **attribute_map)
             self._add_resource(port_object)
-            self.logger.info('Added ' + interface_name + ' Port')
+            if log_items:
+                self.logger.debug('Added ' + interface_name + ' Port')
+            yield
         self.logger.info('Load port completed.')
 
     def _get_chassis_attributes(self, chassis_list):
@@ -343,20 +1730,22 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
         :return:
         """
 
+        for _ in self._iter_chassis_attributes(chassis_list):
+            pass
+
+    def _iter_chassis_attributes(self, chassis_list):
+        """Get Chassis element attributes, yield after every added chassis
+
+        :param chassis_list: list of chassis to load attributes for
+        """
+
         self.logger.info('Start loading Chassis')
+        log_items = self.logger.isEnabledFor(logging.DEBUG)
         for chassis in chassis_list:
             chassis_id = self.relative_path[chassis]
             model = self._get_chassis_model(chassis)
 
-            serial_number = ''
-            backplane_dict = self.entity_table.filter_by_column('Class', 'backplane').sort_by_column('ContainedIn')
-            for key, value in backplane_dict.iteritems():
-                if chassis == int(value['entPhysicalContainedIn']):
-                    serial_number_match = re.search('(?<=SN:)\s*\S+', self.entity_table[key]['entPhysicalDescr'],
-                                                    re.IGNORECASE)
-                    if serial_number_match:
-                        serial_number = serial_number_match.group()
-                        break
+            serial_number = self.chassis_serial_numbers.get(chassis, '')
 
             chassis_details_map = {
                 'chassis_model': model,
@@ -368,12 +1757,23 @@ class EricssonExtendedSNMPAutoload(EricssonGenericSNMPAutoload):
             relative_path = '{0}'.format(chassis_id)
             chassis_object = Chassis(relative_path=relative_path, **chassis_details_map)
             self._add_resource(chassis_object)
-            self.logger.info('Added ' + self.entity_table[chassis]['entPhysicalDescr'] + ' Chass')
+            if log_items:
+                self.logger.debug('Added ' + self.entity_table[chassis]['entPhysicalDescr'] + ' Chass')
+            yield
         self.logger.info('Finished Loading Modules')
 
+    def _get_device_model(self):
+        """Get device model form snmp SNMPv2 mib, load_mib_list is already loaded by _start_autoload
+
+        :return: device model
+        :rtype: str
+        """
+
+        match_name = re.search(r'::(?P<model>\S+$)', self.snmp.get_property('SNMPv2-MIB', 'sysObjectID', '0'))
+        if not match_name:
+            return ''
+        return re.sub('rbn|erirouter', '', match_name.groupdict()['model'], flags=re.IGNORECASE).capitalize()
+
     def _get_chassis_model(self, chassis_id):
-        model = self.entity_table[chassis_id]['entPhysicalDescr']
-        model_match = re.search(r'chassis.*', self.entity_table[chassis_id]['entPhysicalVendorType'], re.IGNORECASE)
-        if model_match:
-            model = model_match.group()
-        return model
+        return self.entity_classifier.get_chassis_model(self.entity_table[chassis_id]['entPhysicalVendorType']) \
+            or self.entity_table[chassis_id]['entPhysicalDescr']
@@ -0,0 +1,122 @@
+import os
+import time
+from functools import partial
+from multiprocessing.pool import ThreadPool
+
+from cloudshell.networking.ericsson.extended.ericsson_autoload_instrumentation import AutoloadInstrumentation
+from cloudshell.networking.ericsson.extended.ericsson_extended_snmp_autoload import EricssonExtendedSNMPAutoload
+from cloudshell.snmp.quali_snmp import QualiSnmp
+
+
+class FleetAutoloadResult(object):
+    def __init__(self, endpoint, autoload_details=None, error=None, wall_time=0.0):
+        """Autoload result of a single device of the fleet
+
+        :param endpoint: device endpoint the autoload was run for
+        :param autoload_details: AutoLoadDetails, None if autoload failed
+        :param error: exception raised by the autoload
+        :param wall_time: autoload duration in seconds
+        """
+
+        self.endpoint = endpoint
+        self.autoload_details = autoload_details
+        self.error = error
+        self.wall_time = wall_time
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+class EricssonFleetAutoload(object):
+    def __init__(self, logger, supported_os=None, max_workers=16, snmp_handler_factory=None,
+                 autoload_class=EricssonExtendedSNMPAutoload, **autoload_attributes):
+        """Run autoload of many devices concurrently
+
+        Every device gets its own snmp handler and autoload instance, compiled linecard configurations
+        and entity classifiers are shared through the process wide caches.
+        Autoload instances get snmp handler factory of their device, so they can walk concurrently
+        if max_in_flight autoload attribute is provided.
+
+        :param logger:
+        :param supported_os: list of supported OS patterns, i.e. ['SEOS']
+        :param max_workers: maximal number of devices discovered at the same time
+        :param snmp_handler_factory: callable which builds snmp handler of the endpoint,
+            by default endpoint is a dict of QualiSnmp arguments, i.e. {'ip': '10.0.0.1', 'snmp_community': 'public'}
+        :param autoload_class: autoload class to instantiate for every device
+        :param autoload_attributes: attributes set on every autoload instance, i.e. configuration_file_path='...',
+            every autoload gets its own copy of the instrumentation attribute, with the same sink.
+            result_log_path without {ip} or {name} placeholder gets the '.{ip}' one before the extension,
+            so devices don't overwrite result files of each other
+        """
+
+        self.logger = logger
+        self.supported_os = supported_os
+        self.max_workers = max_workers
+        self.snmp_handler_factory = snmp_handler_factory or self._create_snmp_handler
+        self.autoload_class = autoload_class
+        self.autoload_attributes = autoload_attributes
+        result_log_path = autoload_attributes.get('result_log_path')
+        if result_log_path and '{ip}' not in result_log_path and '{name}' not in result_log_path:
+            root, extension = os.path.splitext(result_log_path)
+            self.autoload_attributes['result_log_path'] = root + '.{ip}' + extension
+
+    def _create_snmp_handler(self, endpoint):
+        snmp_parameters = dict(endpoint)
+        snmp_parameters.setdefault('logger', self.logger)
+        return QualiSnmp(**snmp_parameters)
+
+    @staticmethod
+    def _get_endpoint_key(endpoint):
+        """Key of the device used when its snmp handler has no transport address
+
+        :param endpoint: device endpoint
+        :return: 'ip' of the endpoint dict or the endpoint itself as string
+        """
+
+        if isinstance(endpoint, dict) and endpoint.get('ip'):
+            return str(endpoint['ip'])
+        return str(endpoint)
+
+    def _autoload_device(self, endpoint):
+        """Autoload single device, never raises
+
+        :param endpoint: device endpoint
+        :rtype: FleetAutoloadResult
+        """
+
+        start_time = time.time()
+        try:
+            autoload = self.autoload_class(snmp_handler=self.snmp_handler_factory(endpoint), logger=self.logger,
+                                           supported_os=self.supported_os)
+            autoload.snmp_handler_factory = partial(self.snmp_handler_factory, endpoint)
+            for attribute_name, attribute_value in self.autoload_attributes.iteritems():
+                if isinstance(attribute_value, AutoloadInstrumentation):
+                    attribute_value = attribute_value.copy()
+                setattr(autoload, attribute_name, attribute_value)
+            if not autoload.snapshot_key:
+                autoload.snapshot_key = self._get_endpoint_key(endpoint)
+            return FleetAutoloadResult(endpoint, autoload_details=autoload.get_autoload_details(),
+                                       wall_time=time.time() - start_time)
+        except Exception as e:
+            self.logger.exception('Autoload of {0} failed'.format(endpoint))
+            return FleetAutoloadResult(endpoint, error=e, wall_time=time.time() - start_time)
+
+    def autoload(self, endpoints):
+        """Autoload all devices, results are yielded as soon as every device is discovered
+
+        :param endpoints: iterable of device endpoints
+        :return: generator of FleetAutoloadResult in the order of completion
+        """
+
+        endpoints = list(endpoints)
+        if not endpoints:
+            return
+        pool = ThreadPool(min(self.max_workers, len(endpoints)))
+        try:
+            for result in pool.imap_unordered(self._autoload_device, endpoints):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
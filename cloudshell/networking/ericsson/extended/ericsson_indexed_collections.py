@@ -0,0 +1,117 @@
+class IndexedList(list):
+    def __init__(self, iterable=()):
+        """List which keeps insertion order and checks membership in constant time
+
+        :param iterable: initial items
+        """
+
+        super(IndexedList, self).__init__()
+        self._counts = {}
+        self.extend(iterable)
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def _add(self, item):
+        self._counts[item] = self._counts.get(item, 0) + 1
+
+    def _discard(self, item):
+        if self._counts[item] > 1:
+            self._counts[item] -= 1
+        else:
+            del self._counts[item]
+
+    def append(self, item):
+        super(IndexedList, self).append(item)
+        self._add(item)
+
+    def extend(self, iterable):
+        for item in iterable:
+            self.append(item)
+
+    def insert(self, index, item):
+        super(IndexedList, self).insert(index, item)
+        self._add(item)
+
+    def remove(self, item):
+        if item not in self._counts:
+            raise ValueError('IndexedList.remove(x): x not in list')
+        super(IndexedList, self).remove(item)
+        self._discard(item)
+
+    def pop(self, index=-1):
+        item = super(IndexedList, self).pop(index)
+        self._discard(item)
+        return item
+
+    def __setitem__(self, index, value):
+        raise TypeError('IndexedList does not support item assignment')
+
+    def __delitem__(self, index):
+        raise TypeError('IndexedList does not support item deletion, use remove or pop')
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+
+class PortMapping(dict):
+    def __init__(self):
+        """Mapping of entPhysicalTable index to ifTable index with reverse index of mapped interfaces
+        """
+
+        super(PortMapping, self).__init__()
+        self._interfaces = {}
+
+    def __setitem__(self, port_index, interface_index):
+        if port_index in self:
+            self._discard_interface(self[port_index])
+        super(PortMapping, self).__setitem__(port_index, interface_index)
+        self._interfaces[interface_index] = self._interfaces.get(interface_index, 0) + 1
+
+    def __delitem__(self, port_index):
+        self._discard_interface(self[port_index])
+        super(PortMapping, self).__delitem__(port_index)
+
+    def _discard_interface(self, interface_index):
+        if self._interfaces[interface_index] > 1:
+            self._interfaces[interface_index] -= 1
+        else:
+            del self._interfaces[interface_index]
+
+    def pop(self, port_index, *default):
+        if port_index in self:
+            self._discard_interface(self[port_index])
+        return super(PortMapping, self).pop(port_index, *default)
+
+    def clear(self):
+        super(PortMapping, self).clear()
+        self._interfaces.clear()
+
+    def update(self, *args, **kwargs):
+        for port_index, interface_index in dict(*args, **kwargs).iteritems():
+            self[port_index] = interface_index
+
+    def setdefault(self, port_index, interface_index=None):
+        if port_index not in self:
+            self[port_index] = interface_index
+        return self[port_index]
+
+    def popitem(self):
+        port_index, interface_index = super(PortMapping, self).popitem()
+        self._discard_interface(interface_index)
+        return port_index, interface_index
+
+    def __reduce__(self):
+        return self.__class__, (), None, None, self.iteritems()
+
+    def has_interface(self, interface_index):
+        """Check whether provided ifTable index is already mapped to any port
+
+        :param interface_index: ifTable index
+        """
+
+        return interface_index in self._interfaces
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+
+from cloudshell.networking.ericsson.extended.ericsson_pfe_port_map import PFEPortMap
+
+
+class LinecardConfiguration(object):
+    def __init__(self, configuration):
+        """Parsed configuration of a single linecard type
+
+        :param configuration: linecard json configuration, i.e.
+            {'linecard_model': '10GE-40', 'ignore_linecard': 'False', 'pfe_0': {'10GE': ['1-20']}, ...}
+        """
+
+        self.linecard_model = str(configuration.get('linecard_model', ''))
+        self.ignore_linecard = str(configuration.get('ignore_linecard', 'False')).lower() == 'true'
+        self.pfe_port_map = PFEPortMap(configuration)
+
+
+class LinecardConfigurationCache(object):
+    MAX_DICT_HASHES = 64
+
+    def __init__(self):
+        """Process wide cache of compiled linecard configurations
+
+        Configuration files are recompiled only when their modification time, size or content hash changes,
+        configuration dictionaries are cached by their content hash. Content hash of a dictionary is computed
+        once per dictionary object, so configuration dictionaries must not be changed in place after the first use.
+        """
+
+        self._lock = threading.Lock()
+        self._file_cache = {}
+        self._hash_cache = {}
+        self._dict_hashes = {}
+
+    @staticmethod
+    def _compile(configuration):
+        """Compile json configuration into {vendor type oid: LinecardConfiguration}
+
+        :param configuration: dict {vendor type oid: linecard configuration}
+        :return: dict
+        """
+
+        result = {}
+        for vendor_type_oid, linecard_configuration in configuration.iteritems():
+            if linecard_configuration and isinstance(linecard_configuration, dict):
+                result[str(vendor_type_oid)] = LinecardConfiguration(linecard_configuration)
+        return result
+
+    def get_from_file(self, file_path):
+        """Get compiled configuration of the json file, reload it only if the file was changed
+
+        :param file_path: path to the json configuration file
+        :return: dict {vendor type oid: LinecardConfiguration}
+        """
+
+        file_path = os.path.abspath(file_path)
+        file_stat = os.stat(file_path)
+        file_state = (file_stat.st_mtime, file_stat.st_size)
+        with self._lock:
+            cached = self._file_cache.get(file_path)
+            if cached and cached[0] == file_state:
+                return cached[2]
+
+        with open(file_path) as configuration_file:
+            content = configuration_file.read()
+        content_hash = hashlib.md5(content).hexdigest()
+        if cached and cached[1] == content_hash:
+            compiled = cached[2]
+        else:
+            compiled = self._compile(json.loads(content))
+
+        with self._lock:
+            self._file_cache[file_path] = (file_state, content_hash, compiled)
+        return compiled
+
+    def get_hash(self, configuration):
+        """Get content hash of already loaded json configuration, serialize it only when it is seen first time
+
+        :param configuration: dict {vendor type oid: linecard configuration}
+        :return: md5 hex digest of the sorted json dump
+        """
+
+        with self._lock:
+            cached = self._dict_hashes.get(id(configuration))
+        # the dictionary itself is kept in the cache, so its id can't be reused by another object
+        if cached and cached[0] is configuration:
+            return cached[1]
+
+        content_hash = hashlib.md5(json.dumps(configuration, sort_keys=True)).hexdigest()
+        with self._lock:
+            if len(self._dict_hashes) >= self.MAX_DICT_HASHES:
+                self._dict_hashes.clear()
+            self._dict_hashes[id(configuration)] = (configuration, content_hash)
+        return content_hash
+
+    def get_from_dict(self, configuration, content_hash=None):
+        """Get compiled configuration of already loaded json configuration
+
+        :param configuration: dict {vendor type oid: linecard configuration}
+        :param content_hash: content hash of the configuration if it is already known, see get_hash
+        :return: dict {vendor type oid: LinecardConfiguration}
+        """
+
+        content_hash = content_hash or self.get_hash(configuration)
+        with self._lock:
+            compiled = self._hash_cache.get(content_hash)
+        if compiled is None:
+            compiled = self._compile(configuration)
+            with self._lock:
+                self._hash_cache[content_hash] = compiled
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._file_cache.clear()
+            self._hash_cache.clear()
+            self._dict_hashes.clear()
+
+
+linecard_configuration_cache = LinecardConfigurationCache()
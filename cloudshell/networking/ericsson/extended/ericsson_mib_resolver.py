@@ -0,0 +1,98 @@
+import os
+import threading
+
+from pysnmp.proto.rfc1902 import ObjectName
+from pysnmp.smi import builder, view
+from pysnmp.smi.rfc1902 import ObjectIdentity
+
+from cloudshell.snmp import quali_snmp
+
+
+class MibSymbolResolver(object):
+    def __init__(self, mib_paths=()):
+        """Process wide translation of MIB symbols to numeric OIDs and of received OIDs back to column names
+
+        MIB modules are loaded once per process into a MIB builder of the resolver, instead of into the MIB builder
+        of every snmp handler, resolved OIDs and columns are cached, so walks sent with numeric OIDs
+        don't need any MIB loaded by the snmp handler. MIB builder is not thread safe, it is used under the lock.
+
+        :param mib_paths: folders with compiled MIB modules, QualiSnmp MIBs are always used
+        """
+
+        self._lock = threading.Lock()
+        self._mib_paths = [os.path.join(os.path.dirname(os.path.abspath(quali_snmp.__file__)), 'mibs')]
+        self._mib_paths.extend(mib_paths)
+        self._mib_viewer = None
+        self._oids = {}
+        self._columns = {}
+        self._column_lengths = []
+
+    def add_mib_path(self, mib_path):
+        """Add folder with compiled MIB modules, i.e. vendor MIBs
+
+        :param mib_path: folder path
+        """
+
+        mib_path = os.path.normpath(mib_path)
+        with self._lock:
+            if mib_path in self._mib_paths:
+                return
+            self._mib_paths.append(mib_path)
+            if self._mib_viewer is not None:
+                mib_builder = self._mib_viewer.mibBuilder
+                mib_builder.setMibSources(*(mib_builder.getMibSources() + (builder.DirMibSource(mib_path),)))
+
+    def _get_mib_viewer(self):
+        if self._mib_viewer is None:
+            mib_builder = builder.MibBuilder()
+            mib_builder.setMibSources(*(mib_builder.getMibSources() +
+                                        tuple(builder.DirMibSource(mib_path) for mib_path in self._mib_paths)))
+            self._mib_viewer = view.MibViewController(mib_builder)
+        return self._mib_viewer
+
+    def get_oid(self, snmp_module_name, symbol_name):
+        """Resolve MIB symbol to its OID, the MIB module is loaded on the first use
+
+        :param snmp_module_name: MIB name, i.e. 'IF-MIB'
+        :param symbol_name: table or column name, i.e. 'ifAlias'
+        :return: OID tuple
+        """
+
+        key = (snmp_module_name, symbol_name)
+        oid = self._oids.get(key)
+        if oid is None:
+            with self._lock:
+                object_identity = ObjectIdentity(snmp_module_name, symbol_name)
+                object_identity.resolveWithMib(self._get_mib_viewer())
+                oid = self._oids[key] = tuple(object_identity.getOid())
+        return oid
+
+    def get_column(self, oid):
+        """Get column name and index suffix of the received OID, column OIDs are resolved once
+
+        :param oid: OID tuple of a column instance, i.e. (1, 3, 6, 1, 2, 1, 2, 2, 1, 2, 1)
+        :return: tuple (column name, index suffix), i.e. ('ifDescr', '1')
+        """
+
+        oid = tuple(oid)
+        for length in self._column_lengths:
+            column_name = self._columns.get(oid[:length])
+            if column_name is not None:
+                return column_name, '.'.join(str(part) for part in oid[length:])
+
+        with self._lock:
+            mib_viewer = self._get_mib_viewer()
+            module_name, column_name, suffix = mib_viewer.getNodeLocation(ObjectName(oid))
+            # OIDs of not loaded MIB modules resolve to their nearest loaded parent node, i.e. 'mib-2',
+            # it is not cached so it doesn't hide columns of the modules loaded later
+            mib_node, = mib_viewer.mibBuilder.importSymbols(module_name, column_name)
+            column_classes = mib_viewer.mibBuilder.importSymbols('SNMPv2-SMI', 'MibTableColumn', 'MibScalar')
+            if isinstance(mib_node, column_classes):
+                length = len(oid) - len(suffix)
+                self._columns[oid[:length]] = column_name
+                if length not in self._column_lengths:
+                    self._column_lengths = sorted(self._column_lengths + [length], reverse=True)
+        return column_name, str(suffix)
+
+
+mib_resolver = MibSymbolResolver()
@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+
+class PFEPortMap(object):
+    def __init__(self, pfe_configuration):
+        """Compile PFE part of the linecard configuration into port lookup index
+
+        Port ranges are stored as sorted disjoint intervals, every interval keeps PFEs and speeds it belongs to,
+        so the lookup cost doesn't depend on the number of configured ranges.
+
+        :param pfe_configuration: linecard configuration, i.e. {'pfe_0': {'10GE': ['1-20', '24']}, ...}
+        """
+
+        self.pfe_names = []
+        self._port_names = {}
+        self._interval_starts = []
+        self._intervals = []
+        self._lookup_cache = {}
+
+        port_ranges = []
+        for pfe in pfe_configuration:
+            if not isinstance(pfe_configuration[pfe], dict):
+                continue
+            pfe_name = str(pfe)
+            self.pfe_names.append(pfe_name)
+            for key, values in pfe_configuration[pfe].iteritems():
+                port_speed = str(key)
+                for value in list(values):
+                    if '-' in value:
+                        port_min, port_max = value.split('-')
+                        port_ranges.append((int(port_min), int(port_max), pfe_name, port_speed))
+                    elif self._is_port_number(str(value)):
+                        port_ranges.append((int(value), int(value), pfe_name, port_speed))
+                    else:
+                        self._port_names.setdefault(str(value), []).append((pfe_name, port_speed))
+
+        self._build_intervals(port_ranges)
+
+    @staticmethod
+    def _is_port_number(port_id):
+        return port_id.isdigit() and str(int(port_id)) == port_id
+
+    def _group_speeds(self, pfe_speed_pairs):
+        """Group (pfe, speed) pairs by PFE, keeping PFEs in configuration order
+
+        :return: tuple of (pfe_name, frozenset of speeds)
+        """
+
+        speeds = {}
+        for pfe_name, port_speed in pfe_speed_pairs:
+            speeds.setdefault(pfe_name, set()).add(port_speed)
+        return tuple((pfe_name, frozenset(speeds[pfe_name])) for pfe_name in self.pfe_names if pfe_name in speeds)
+
+    def _build_intervals(self, port_ranges):
+        """Split possibly overlapping port ranges into sorted disjoint intervals
+
+        :param port_ranges: list of (first port, last port, pfe name, port speed)
+        """
+
+        boundaries = set()
+        for port_min, port_max, pfe_name, port_speed in port_ranges:
+            if port_min <= port_max:
+                boundaries.add(port_min)
+                boundaries.add(port_max + 1)
+        boundaries = sorted(boundaries)
+
+        for start, end in zip(boundaries, boundaries[1:]):
+            pfe_speed_pairs = [(pfe_name, port_speed) for port_min, port_max, pfe_name, port_speed in port_ranges
+                               if port_min <= start and end - 1 <= port_max]
+            if not pfe_speed_pairs:
+                continue
+            port_pfes = self._group_speeds(pfe_speed_pairs)
+            if self._intervals and self._intervals[-1][0] == start - 1 and self._intervals[-1][1] == port_pfes:
+                self._intervals[-1] = (end - 1, port_pfes)
+                continue
+            self._interval_starts.append(start)
+            self._intervals.append((end - 1, port_pfes))
+
+    def get_port_pfes(self, port_id):
+        """Get PFEs and speeds configured for the port
+
+        :param port_id: port relative id, i.e. '12'
+        :return: tuple of (pfe_name, frozenset of speeds), i.e. (('pfe_0', frozenset(['10GE'])),)
+        """
+
+        if port_id in self._lookup_cache:
+            return self._lookup_cache[port_id]
+
+        result = ()
+        if self._is_port_number(port_id):
+            position = bisect_right(self._interval_starts, int(port_id)) - 1
+            if position >= 0 and int(port_id) <= self._intervals[position][0]:
+                result = self._intervals[position][1]
+        elif port_id in self._port_names:
+            result = self._group_speeds(self._port_names[port_id])
+
+        self._lookup_cache[port_id] = result
+        return result
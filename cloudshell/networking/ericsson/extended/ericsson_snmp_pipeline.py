@@ -0,0 +1,70 @@
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from cloudshell.networking.ericsson.extended.ericsson_adaptive_walker import AdaptiveSnmpWalker
+
+
+class SnmpRequestPipeline(object):
+    def __init__(self, snmp_handler_factory, max_in_flight, adaptive_walk=False):
+        """Issue independent SNMP walks of a single device concurrently
+
+        SNMP handlers are not thread safe, so every worker thread walks with its own handler built by
+        snmp_handler_factory, the number of workers limits the number of requests in flight.
+
+        :param snmp_handler_factory: callable without arguments which builds new snmp handler of the device,
+            it is called in the worker thread before the first walk of the worker
+        :param max_in_flight: maximal number of concurrent requests
+        :param adaptive_walk: walk with adaptively sized GETBULK requests, see AdaptiveSnmpWalker
+        """
+
+        self._snmp_handler_factory = snmp_handler_factory
+        self._adaptive_walk = adaptive_walk
+        self._pool = ThreadPool(max_in_flight)
+        self._local = threading.local()
+        self._requests = {}
+
+    def _walk(self, snmp_module_name, table_name):
+        snmp_handler = getattr(self._local, 'snmp_handler', None)
+        if snmp_handler is None:
+            snmp_handler = self._local.snmp_handler = self._snmp_handler_factory()
+            if self._adaptive_walk:
+                self._local.walker = AdaptiveSnmpWalker(snmp_handler)
+        start_time = time.time()
+        if self._adaptive_walk:
+            request_count = self._local.walker.request_count
+            table = self._local.walker.walk(snmp_module_name, table_name)
+            request_count = self._local.walker.request_count - request_count
+        else:
+            table = snmp_handler.get_table(snmp_module_name, table_name)
+            request_count = None
+        return table, time.time() - start_time, request_count
+
+    def walk(self, snmp_module_name, table_name):
+        """Schedule walk of the table, table is walked only once however many times it is scheduled
+
+        :param snmp_module_name: MIB name, i.e. 'IF-MIB'
+        :param table_name: table or column name, i.e. 'ifAlias'
+        """
+
+        key = (snmp_module_name, table_name)
+        if key not in self._requests:
+            self._requests[key] = self._pool.apply_async(self._walk, key)
+
+    def get_table(self, snmp_module_name, table_name):
+        """Wait for the scheduled walk
+
+        :return: tuple (QualiMibTable, walk duration in seconds, number of GETBULK requests of the adaptive walk),
+            number of requests is None for GETNEXT walks, they are counted by the snmp handler itself
+        :raise KeyError: if the walk was not scheduled
+        """
+
+        return self._requests.pop((snmp_module_name, table_name)).get()
+
+    def is_scheduled(self, snmp_module_name, table_name):
+        return (snmp_module_name, table_name) in self._requests
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self._requests.clear()
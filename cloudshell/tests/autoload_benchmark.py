@@ -0,0 +1,235 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from cloudshell.networking.ericsson.extended.ericsson_extended_snmp_autoload import EricssonExtendedSNMPAutoload
+from cloudshell.tests.replay_snmp_handler import ReplaySnmpHandler, MIB_SYMBOLS, oid_to_tuple, oid_to_str
+
+DEFAULT_SCENARIOS = [(1, 48), (4, 192), (10, 480), (20, 960), (20, 2000)]
+LINECARD_VENDOR_TYPE = '1.3.6.1.4.1.193.218.6.20.{0}'
+PORT_VENDOR_TYPE = '1.3.6.1.4.1.193.218.6.30.1'
+
+
+def build_ssr_records(linecards, ports):
+    """Generate SNMP records of synthetic SSR chassis
+
+    :param linecards: number of linecards
+    :param ports: total number of ethernet ports, spread evenly across linecards
+    :return: dict {numeric oid tuple: rendered value} suitable for ReplaySnmpHandler
+    """
+
+    records = {}
+
+    def put(symbol, index, value):
+        records[oid_to_tuple(MIB_SYMBOLS[symbol]) + oid_to_tuple(str(index))] = value
+
+    def put_entity(index, entity_class, contained_in, position, description, name, vendor_type):
+        put('entPhysicalDescr', index, description)
+        put('entPhysicalVendorType', index, vendor_type)
+        put('entPhysicalContainedIn', index, str(contained_in))
+        put('entPhysicalClass', index, "'{0}'".format(entity_class))
+        put('entPhysicalParentRelPos', index, str(position))
+        put('entPhysicalName', index, name)
+
+    put('sysDescr', 0, 'Ericsson Version SEOS-16.1.2.3 , built at 2017-01-01')
+    put('sysObjectID', 0, 'RBN-PRODUCT-MIB::rbnSSR8020')
+    put('sysUpTime', 0, '100000')
+    put('sysContact', 0, 'noc')
+    put('sysName', 0, 'ssr-benchmark')
+    put('sysLocation', 0, 'lab')
+    put('entLastChangeTime', 0, '1000')
+    put('ifTableLastChange', 0, '1000')
+    put('lldpStatsRemTablesLastChangeTime', 0, '1000')
+    put('dot3adTablesLastChanged', 0, '1000')
+    put_entity(1, 'chassis', 0, -1, 'SSR 8020 chassis', 'chassis', '1.3.6.1.4.1.193.218.6.10.1')
+    put_entity(2, 'backplane', 1, 0, 'SSR backplane SN: BP000001', 'backplane', '1.3.6.1.4.1.193.218.6.11.1')
+    for power_supply in (1, 2):
+        put_entity(2 + power_supply, 'powerSupply', 1, power_supply, 'PSU sn:PS0{0} rev:A'.format(power_supply),
+                   'PSU {0}'.format(power_supply), '1.3.6.1.4.1.193.218.6.12.1')
+
+    ports_per_linecard = max(1, ports // max(1, linecards))
+    for slot in range(1, linecards + 1):
+        container_index = slot * 10000
+        module_index = container_index + 1
+        put_entity(container_index, 'container', 1, slot, 'Slot {0}'.format(slot), 'slot {0}'.format(slot),
+                   '1.3.6.1.4.1.193.218.6.14.1')
+        put_entity(module_index, 'module', container_index, 0,
+                   '{0}-port 10GE Card sn:SN{1:04d} rev:3'.format(ports_per_linecard, slot), 'card {0}'.format(slot),
+                   LINECARD_VENDOR_TYPE.format(slot % 2 + 1))
+        for port in range(1, ports_per_linecard + 1):
+            port_index = module_index + 10 + port
+            if_index = slot * 10000 + port
+            port_name = 'ethernet {0}/{1}'.format(slot, port)
+            put_entity(port_index, 'port', module_index, port, 'port ' + port_name, 'port {0}/{1}'.format(slot, port),
+                       PORT_VENDOR_TYPE)
+            put('entAliasMappingIdentifier', '{0}.0'.format(port_index), 'IF-MIB::ifIndex.{0}'.format(if_index))
+            put('ifDescr', if_index, port_name)
+            put('ifType', if_index, "'ethernetCsmacd'")
+            put('ifMtu', if_index, '1500')
+            put('ifPhysAddress', if_index, '00:11:22:{0:02x}:{1:02x}:{2:02x}'.format(slot, port // 256, port % 256))
+            put('ifName', if_index, port_name)
+            put('ifHighSpeed', if_index, '10000')
+            put('ifAlias', if_index, 'core-{0}-{1}'.format(slot, port))
+            put('dot3StatsIndex', if_index, str(if_index))
+            put('dot3StatsDuplexStatus', if_index, "'fullDuplex'")
+            put('ifMauAutoNegAdminStatus', '{0}.1'.format(if_index), "'enabled'")
+            # every third port has an LLDP neighbor, its local port description only contains the port name,
+            # so ethernet 1/1 has to be told apart from ethernet 1/10 and ethernet 1/100
+            if port % 3 == 1:
+                put('lldpLocPortDesc', if_index, port_name + ' uplink')
+                put('lldpRemPortDesc', '0.{0}.1'.format(if_index), 'ethernet 9/{0}'.format(port))
+                put('lldpRemSysName', '0.{0}.1'.format(if_index), 'peer-{0}'.format(slot))
+            else:
+                put('lldpLocPortDesc', if_index, port_name)
+    put('ifNumber', 0, str(linecards * ports_per_linecard))
+    return records
+
+
+def build_ssr_configuration():
+    """Linecard configuration matching linecards generated by build_ssr_records
+    """
+
+    return {
+        LINECARD_VENDOR_TYPE.format(1): {'linecard_model': '10GE-SSR', 'ignore_linecard': 'False',
+                                         'pfe_0': {'10GE': ['1-500']}, 'pfe_1': {'10GE': ['501-1000']}},
+        LINECARD_VENDOR_TYPE.format(2): {'linecard_model': '10GE-SSR-B', 'ignore_linecard': 'False',
+                                         'pfe_0': {'10GE': ['1-1000'], '1GE': ['1-24']}},
+    }
+
+
+def write_snmprec(records, file_path):
+    """Store records as snmpsim .snmprec capture, which can be replayed with ReplaySnmpHandler.from_snmprec
+
+    :param records: dict {numeric oid tuple: rendered value}
+    :param file_path: path of the capture file
+    """
+
+    with open(file_path, 'w') as capture:
+        for oid in sorted(records):
+            capture.write('{0}|4|{1}\n'.format(oid_to_str(oid), records[oid]))
+
+
+def get_peak_memory():
+    """Peak resident set size of the current process in kilobytes,
+    it is the high-water mark of the whole process, see run_scenario_in_subprocess
+    """
+
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_memory //= 1024
+    return peak_memory
+
+
+def run_autoload(snmp_handler, configuration, logger, **attributes):
+    """Run single autoload against the provided handler
+
+    :return: tuple (AutoLoadDetails, wall time in seconds)
+    """
+
+    autoload = EricssonExtendedSNMPAutoload(snmp_handler=snmp_handler, logger=logger, supported_os=['SEOS'])
+    autoload.configuration = configuration
+    for attribute_name, attribute_value in attributes.iteritems():
+        setattr(autoload, attribute_name, attribute_value)
+    start_time = time.time()
+    result = autoload.get_autoload_details()
+    return result, time.time() - start_time
+
+
+def run_scenario(linecards, ports, latency=0.0, sleep=False, logger=None, var_bind_latency=0.0, drop_rate=0.0,
+                 **attributes):
+    """Autoload synthetic SSR and collect benchmark results
+
+    :return: dict with wall time, SNMP round trips, estimated bytes, simulated latency and peak memory
+    """
+
+    if logger is None:
+        logger = logging.getLogger('autoload_benchmark')
+    records = build_ssr_records(linecards, ports)
+    snmp_handlers = []
+
+    def snmp_handler_factory():
+        snmp_handlers.append(ReplaySnmpHandler(records, latency=latency, sleep=sleep, logger=logger,
+                                               var_bind_latency=var_bind_latency, drop_rate=drop_rate,
+                                               seed=len(snmp_handlers)))
+        return snmp_handlers[-1]
+
+    result, wall_time = run_autoload(snmp_handler_factory(), json.loads(json.dumps(build_ssr_configuration())),
+                                     logger, snmp_handler_factory=snmp_handler_factory, **attributes)
+    return {'linecards': linecards,
+            'ports': ports,
+            'resources': len(result.resources),
+            'attributes': len(result.attributes),
+            'wall_time': wall_time,
+            'requests': sum(snmp_handler.request_count for snmp_handler in snmp_handlers),
+            'bytes': sum(snmp_handler.bytes_count for snmp_handler in snmp_handlers),
+            'simulated_latency': sum(snmp_handler.simulated_latency for snmp_handler in snmp_handlers),
+            'timeouts': sum(snmp_handler.timeout_count for snmp_handler in snmp_handlers),
+            'peak_memory': get_peak_memory()}
+
+
+def run_scenario_in_subprocess(linecards, ports, **kwargs):
+    """Run scenario in a fresh interpreter, so its peak memory isn't affected by the scenarios run before it
+
+    :param kwargs: run_scenario arguments except logger, they have to be JSON serializable
+    :return: dict, the same as run_scenario returns
+    """
+
+    kwargs.update(linecards=linecards, ports=ports)
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    output = subprocess.check_output([sys.executable, '-m', 'cloudshell.tests.autoload_benchmark',
+                                      '--run-scenario', json.dumps(kwargs)], env=environment)
+    return json.loads(output.splitlines()[-1])
+
+
+def parse_scenario(value):
+    linecards, ports = value.split('x')
+    return int(linecards), int(ports)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark EricssonExtendedSNMPAutoload against synthetic SSR')
+    parser.add_argument('scenarios', nargs='*', type=parse_scenario, default=DEFAULT_SCENARIOS,
+                        help='LINECARDSxPORTS, i.e. 20x2000')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated SNMP round trip time, seconds')
+    parser.add_argument('--sleep', action='store_true', help='really wait for the simulated latency')
+    parser.add_argument('--legacy', action='store_true', help='load entities one by one instead of table walks')
+    parser.add_argument('--max-in-flight', type=int, default=1, help='number of concurrent SNMP walks')
+    parser.add_argument('--getnext', action='store_true', help='walk with GETNEXT instead of GETBULK requests')
+    parser.add_argument('--var-bind-latency', type=float, default=0.0,
+                        help='simulated agent time per GETBULK response var bind, seconds')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='share of lost GETBULK requests, 0.0 - 1.0')
+    parser.add_argument('--write-snmprec', metavar='PATH', help='store capture of the last scenario and exit')
+    parser.add_argument('--run-scenario', metavar='JSON', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logger = logging.getLogger('autoload_benchmark')
+    logger.addHandler(logging.NullHandler())
+
+    if args.run_scenario:
+        print(json.dumps(run_scenario(logger=logger, **json.loads(args.run_scenario))))
+        return
+
+    if args.write_snmprec:
+        linecards, ports = args.scenarios[-1]
+        write_snmprec(build_ssr_records(linecards, ports), args.write_snmprec)
+        return
+
+    row_format = '{linecards:>9} {ports:>6} {resources:>9} {wall_time:>9.3f} {requests:>9} {bytes:>11} ' \
+                 '{simulated_latency:>10.2f} {timeouts:>8} {peak_memory:>10}'
+    print('{0:>9} {1:>6} {2:>9} {3:>9} {4:>9} {5:>11} {6:>10} {7:>8} {8:>10}'.format(
+        'linecards', 'ports', 'resources', 'wall, s', 'requests', 'bytes', 'latency, s', 'timeouts', 'peak, KB'))
+    for linecards, ports in args.scenarios:
+        result = run_scenario_in_subprocess(linecards, ports, latency=args.latency, sleep=args.sleep,
+                                            var_bind_latency=args.var_bind_latency, drop_rate=args.drop_rate,
+                                            bulk_mode=not args.legacy, max_in_flight=args.max_in_flight,
+                                            adaptive_walk=not args.getnext)
+        print(row_format.format(**result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+
+from cloudshell.networking.ericsson.extended.ericsson_autoload_entities import EricssonPort, EricssonModule, PFE, \
+    CompactEricssonPort, CompactEricssonModule, CompactPFE
+
+DEFAULT_PORT_COUNTS = [48, 480, 2000, 10000]
+PORTS_PER_MODULE = 48
+PFES_PER_MODULE = 2
+ENTITY_CLASSES = {'current': (EricssonPort, EricssonModule, PFE),
+                  'compact': (CompactEricssonPort, CompactEricssonModule, CompactPFE)}
+
+
+def get_deep_size(root_object):
+    """Total size in bytes of the object and every object reachable through its attributes and items,
+    objects shared between several owners are counted once
+
+    :param root_object: object to measure
+    """
+
+    seen_ids = set()
+    pending = [root_object]
+    total_size = 0
+    while pending:
+        current_object = pending.pop()
+        if id(current_object) in seen_ids or isinstance(current_object, type):
+            continue
+        seen_ids.add(id(current_object))
+        total_size += sys.getsizeof(current_object)
+        if isinstance(current_object, dict):
+            pending.extend(current_object.iterkeys())
+            pending.extend(current_object.itervalues())
+        elif isinstance(current_object, (list, tuple, set, frozenset)):
+            pending.extend(current_object)
+        if hasattr(current_object, '__dict__'):
+            pending.append(current_object.__dict__)
+        for slot_class in getattr(type(current_object), '__mro__', ()):
+            for slot_name in slot_class.__dict__.get('__slots__', ()):
+                if hasattr(current_object, slot_name):
+                    pending.append(getattr(current_object, slot_name))
+    return total_size
+
+
+def build_entities(port_count, port_class, module_class, pfe_class):
+    """Build entities of the synthetic device the same way autoload does
+
+    :return: list of module, PFE and port objects
+    """
+
+    entities = []
+    for module_index in range(1, (port_count + PORTS_PER_MODULE - 1) // PORTS_PER_MODULE + 1):
+        module_id = '0/{0}'.format(module_index)
+        entities.append(module_class(name='Card {0} - 10GE-SSR'.format(module_index), model='Generic Module',
+                                     relative_path=module_id, serial_number='SN{0:04d}'.format(module_index),
+                                     module_model='10GE-SSR', version='3', ericsson_model='10GE-SSR'))
+        for pfe_index in range(PFES_PER_MODULE):
+            entities.append(pfe_class(name='PFE{0}'.format(pfe_index),
+                                      relative_path='{0}/{1}'.format(module_id, pfe_index)))
+        first_port = (module_index - 1) * PORTS_PER_MODULE
+        for port_index in range(1, min(PORTS_PER_MODULE, port_count - first_port) + 1):
+            port_name = 'ethernet {0}/{1}'.format(module_index, port_index)
+            entities.append(port_class(name=port_name.replace('/', '-').title(),
+                                       relative_path='{0}/{1}/{2}'.format(module_id, port_index % 2, port_index),
+                                       description='core-{0}-{1}'.format(module_index, port_index),
+                                       l2_protocol_type='ethernetCsmacd', mtu='1500', bandwidth='10000',
+                                       mac='00:11:22:{0:02x}:{1:02x}:00'.format(module_index, port_index),
+                                       duplex='Full', auto_negotiation='True', supports_10ge=True))
+    return entities
+
+
+def run_scenario(port_count, kind):
+    """Build and serialize entities of the synthetic device with the current or compact classes
+
+    :param port_count: number of ports
+    :param kind: 'current' or 'compact'
+    :return: dict with entity heap size, serialized result size and timings
+    """
+
+    start_time = time.time()
+    entities = build_entities(port_count, *ENTITY_CLASSES[kind])
+    build_time = time.time() - start_time
+    start_time = time.time()
+    resources = [entity.get_autoload_resource_details() for entity in entities]
+    attributes = [attribute for entity in entities for attribute in entity.get_autoload_resource_attributes()]
+    serialize_time = time.time() - start_time
+    entities_size = get_deep_size(entities)
+    result_size = get_deep_size((resources, attributes))
+    del entities
+    return {'kind': kind,
+            'ports': port_count,
+            'entities_kb': entities_size // 1024,
+            'result_kb': result_size // 1024,
+            'attributes': len(attributes),
+            'build_time': build_time,
+            'serialize_time': serialize_time}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare heap used by current and compact autoload entities')
+    parser.add_argument('port_counts', nargs='*', type=int, default=DEFAULT_PORT_COUNTS, help='number of ports')
+    args = parser.parse_args(argv)
+
+    row_format = '{kind:>8} {ports:>6} {entities_kb:>12} {result_kb:>10} {attributes:>10} {build_time:>8.3f} ' \
+                 '{serialize_time:>12.3f}'
+    print('{0:>8} {1:>6} {2:>12} {3:>10} {4:>10} {5:>8} {6:>12}'.format(
+        'classes', 'ports', 'entities, KB', 'result, KB', 'attributes', 'build, s', 'serialize, s'))
+    for port_count in args.port_counts:
+        for kind in ('current', 'compact'):
+            print(row_format.format(**run_scenario(port_count, kind)))
+
+
+if __name__ == '__main__':
+    main()
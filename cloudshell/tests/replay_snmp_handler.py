@@ -0,0 +1,426 @@
+import random
+import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from cloudshell.networking.ericsson.extended.ericsson_adaptive_walker import SnmpRequestTimeout, SnmpResponseTooBig
+from cloudshell.snmp.quali_snmp import QualiMibTable
+
+NO_SUCH_INSTANCE = 'No Such Instance currently exists at this OID'
+
+MIB_SYMBOLS = {
+    'sysDescr': '1.3.6.1.2.1.1.1',
+    'sysObjectID': '1.3.6.1.2.1.1.2',
+    'sysUpTime': '1.3.6.1.2.1.1.3',
+    'sysContact': '1.3.6.1.2.1.1.4',
+    'sysName': '1.3.6.1.2.1.1.5',
+    'sysLocation': '1.3.6.1.2.1.1.6',
+    'ifNumber': '1.3.6.1.2.1.2.1',
+    'ifTable': '1.3.6.1.2.1.2.2',
+    'ifDescr': '1.3.6.1.2.1.2.2.1.2',
+    'ifType': '1.3.6.1.2.1.2.2.1.3',
+    'ifMtu': '1.3.6.1.2.1.2.2.1.4',
+    'ifPhysAddress': '1.3.6.1.2.1.2.2.1.6',
+    'ifTableLastChange': '1.3.6.1.2.1.31.1.5',
+    'ifXTable': '1.3.6.1.2.1.31.1.1',
+    'ifName': '1.3.6.1.2.1.31.1.1.1.1',
+    'ifHighSpeed': '1.3.6.1.2.1.31.1.1.1.15',
+    'ifAlias': '1.3.6.1.2.1.31.1.1.1.18',
+    'ipAdEntIfIndex': '1.3.6.1.2.1.4.20.1.2',
+    'dot3StatsIndex': '1.3.6.1.2.1.10.7.2.1.1',
+    'dot3StatsDuplexStatus': '1.3.6.1.2.1.10.7.2.1.19',
+    'ifMauAutoNegAdminStatus': '1.3.6.1.2.1.26.5.1.1.1',
+    'entPhysicalTable': '1.3.6.1.2.1.47.1.1.1',
+    'entPhysicalDescr': '1.3.6.1.2.1.47.1.1.1.1.2',
+    'entPhysicalVendorType': '1.3.6.1.2.1.47.1.1.1.1.3',
+    'entPhysicalContainedIn': '1.3.6.1.2.1.47.1.1.1.1.4',
+    'entPhysicalClass': '1.3.6.1.2.1.47.1.1.1.1.5',
+    'entPhysicalParentRelPos': '1.3.6.1.2.1.47.1.1.1.1.6',
+    'entPhysicalName': '1.3.6.1.2.1.47.1.1.1.1.7',
+    'entPhysicalSerialNum': '1.3.6.1.2.1.47.1.1.1.1.11',
+    'entPhysicalModelName': '1.3.6.1.2.1.47.1.1.1.1.13',
+    'entAliasMappingIdentifier': '1.3.6.1.2.1.47.1.3.2.1.2',
+    'entLastChangeTime': '1.3.6.1.2.1.47.1.4.1',
+    'lldpStatsRemTablesLastChangeTime': '1.0.8802.1.1.2.1.2.1',
+    'lldpLocPortDesc': '1.0.8802.1.1.2.1.3.7.1.4',
+    'lldpRemTable': '1.0.8802.1.1.2.1.4.1',
+    'lldpRemPortDesc': '1.0.8802.1.1.2.1.4.1.1.8',
+    'lldpRemSysName': '1.0.8802.1.1.2.1.4.1.1.9',
+    'dot3adAggPortAttachedAggID': '1.2.840.10006.300.43.1.2.1.1.13',
+    'dot3adTablesLastChanged': '1.2.840.10006.300.43.1.4',
+}
+
+NAMED_VALUES = {
+    'entPhysicalClass': {1: 'other', 2: 'unknown', 3: 'chassis', 4: 'backplane', 5: 'container', 6: 'powerSupply',
+                         7: 'fan', 8: 'sensor', 9: 'module', 10: 'port', 11: 'stack', 12: 'cpu'},
+    'ifType': {1: 'other', 6: 'ethernetCsmacd', 24: 'softwareLoopback', 39: 'sonet', 53: 'propVirtual',
+               117: 'gigabitEthernet', 135: 'l2vlan', 161: 'ieee8023adLag', 171: 'pos'},
+    'dot3StatsDuplexStatus': {1: 'unknown', 2: 'halfDuplex', 3: 'fullDuplex'},
+    'ifMauAutoNegAdminStatus': {1: 'enabled', 2: 'disabled'},
+}
+
+SNMPWALK_LINE_RE = re.compile(r'^\.?(?P<oid>(iso|\d+)(\.\d+)+)\s*=\s*(?:(?P<type>[\w-]+):\s*)?(?P<value>.*)$')
+TIMETICKS_RE = re.compile(r'^\((?P<ticks>\d+)\)')
+NUMERIC_OID_RE = re.compile(r'^\d+(\.\d+)+$')
+
+
+def oid_to_tuple(oid):
+    return tuple(int(part) for part in oid.strip('.').replace('iso', '1', 1).split('.'))
+
+
+def oid_to_str(oid):
+    return '.'.join(str(part) for part in oid)
+
+
+class ReplayMibNode(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class ReplayObjectIdentity(object):
+    def __init__(self, oid, symbol_name='', indices=()):
+        """Resolved OID of the replayed var bind, provides the part of pysnmp ObjectIdentity API
+        autoload reads from var binds
+
+        :param oid: oid tuple
+        :param symbol_name: MIB symbol name, i.e. 'entPhysicalVendorType'
+        :param indices: index suffix tuple
+        """
+
+        self._oid = oid
+        self._symbol_name = symbol_name
+        self._indices = indices
+
+    def getOid(self):
+        return self._oid
+
+    def getMibSymbol(self):
+        return '', self._symbol_name, self._indices
+
+    def getMibNode(self):
+        return ReplayMibNode(self._oid)
+
+    def prettyPrint(self):
+        return oid_to_str(self._oid)
+
+
+class ReplaySnmpHandler(object):
+    """SNMP handler which serves recorded snmpwalk/snmprec captures instead of a live device
+
+    Implements the subset of QualiSnmp interface used by autoload and counts all simulated
+    request/response PDUs, estimated bytes on the wire and simulated latency.
+    Like QualiSnmp, it keeps var binds of the last request in var_binds, OID values are returned
+    as resolved object identities, so vendor types are read from var binds the same way as from a live device.
+    """
+
+    PDU_OVERHEAD = 40
+
+    def __init__(self, records, latency=0.0, sleep=False, logger=None, var_bind_latency=0.0, drop_rate=0.0,
+                 seed=0, max_response_size=None):
+        """
+        :param records: dict {numeric oid tuple: rendered value}
+        :param latency: simulated round trip time of a single request in seconds
+        :param sleep: really wait for the simulated latency on every request
+        :param logger:
+        :param var_bind_latency: simulated agent processing time of every var bind in GETBULK response, in seconds
+        :param drop_rate: share of GETBULK requests which are lost and never answered, 0.0 - 1.0
+        :param seed: seed of the random generator deciding which requests are lost
+        :param max_response_size: maximal GETBULK response size in bytes, agent returns less var binds than requested
+            if the response doesn't fit
+        """
+
+        self._records = dict(records)
+        self._oids = sorted(self._records.keys())
+        self._symbols = dict((name, oid_to_tuple(oid)) for name, oid in MIB_SYMBOLS.iteritems())
+        self._symbol_names = dict((oid, name) for name, oid in self._symbols.iteritems())
+        self._logger = logger
+        self.latency = latency
+        self.sleep = sleep
+        self.var_bind_latency = var_bind_latency
+        self.drop_rate = drop_rate
+        self.max_response_size = max_response_size
+        self._random = random.Random(seed)
+        self.var_binds = []
+        self.reset_counters()
+
+    @classmethod
+    def from_snmprec(cls, file_path, **kwargs):
+        """Load snmpsim .snmprec capture, lines like '1.3.6.1.2.1.1.5.0|4|router'
+
+        :param file_path: path to the capture
+        """
+
+        records = {}
+        with open(file_path) as capture:
+            for line in capture:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                oid, value_type, value = line.split('|', 2)
+                records[oid_to_tuple(oid)] = cls._render_snmprec_value(oid_to_tuple(oid), value_type, value)
+        return cls(cls._name_values(records), **kwargs)
+
+    @classmethod
+    def from_snmpwalk(cls, file_path, **kwargs):
+        """Load numeric snmpwalk output, lines like '.1.3.6.1.2.1.1.5.0 = STRING: router'
+
+        :param file_path: path to the capture made with 'snmpwalk -On'
+        """
+
+        records = {}
+        last_oid = None
+        with open(file_path) as capture:
+            for line in capture:
+                line = line.rstrip('\r\n')
+                match = SNMPWALK_LINE_RE.search(line)
+                if not match:
+                    if last_oid and line:
+                        records[last_oid] += '\n' + line.rstrip('"')
+                    continue
+                last_oid = oid_to_tuple(match.group('oid'))
+                records[last_oid] = cls._render_snmpwalk_value(match.group('type') or '', match.group('value'))
+        return cls(cls._name_values(records), **kwargs)
+
+    @staticmethod
+    def _render_snmprec_value(oid, value_type, value):
+        if value_type.endswith('x'):
+            value = value.decode('hex') if value else ''
+            if oid[:len(oid_to_tuple(MIB_SYMBOLS['ifPhysAddress']))] == oid_to_tuple(MIB_SYMBOLS['ifPhysAddress']):
+                return ':'.join('{0:02x}'.format(ord(char)) for char in value)
+        return value
+
+    @staticmethod
+    def _render_snmpwalk_value(value_type, value):
+        value = value.strip()
+        if value_type == 'STRING':
+            return value.strip('"')
+        if value_type == 'Hex-STRING':
+            return ':'.join(value.lower().split())
+        if value_type == 'OID':
+            return value.strip('.')
+        if value_type == 'Timeticks':
+            match = TIMETICKS_RE.search(value)
+            return match.group('ticks') if match else value
+        if value_type == 'INTEGER':
+            return value.split('(')[-1].rstrip(')') if '(' in value else value
+        return value
+
+    @classmethod
+    def _name_values(cls, records):
+        """Render integer values of enumerated columns the same way pysnmp does, i.e. "'chassis'"
+        """
+
+        column_names = dict((oid_to_tuple(MIB_SYMBOLS[name]), name) for name in NAMED_VALUES)
+        for oid, value in records.iteritems():
+            name = column_names.get(oid[:-1]) or column_names.get(oid[:-2])
+            if name and value.isdigit() and int(value) in NAMED_VALUES[name]:
+                records[oid] = "'{0}'".format(NAMED_VALUES[name][int(value)])
+        return records
+
+    @property
+    def logger(self):
+        return self._logger
+
+    def reset_counters(self):
+        self.request_count = 0
+        self.bytes_count = 0
+        self.simulated_latency = 0.0
+        self.timeout_count = 0
+
+    def clock(self):
+        """Time spent by the simulated device, in seconds
+        """
+
+        return self.simulated_latency
+
+    def _request(self, request_var_binds, response_var_binds, latency=None):
+        """Account single request/response exchange
+
+        :param request_var_binds: list of requested oid tuples
+        :param response_var_binds: list of (oid tuple, value) received in response
+        :param latency: time the exchange took, the handler latency by default
+        """
+
+        if latency is None:
+            latency = self.latency
+        self.request_count += 1
+        self.bytes_count += self.PDU_OVERHEAD
+        self.bytes_count += sum(2 * len(oid) for oid in request_var_binds)
+        if response_var_binds is not None:
+            self.bytes_count += self.PDU_OVERHEAD
+            self.bytes_count += sum(2 * len(oid) + len(str(value)) for oid, value in response_var_binds)
+        self.simulated_latency += latency
+        if self.sleep and latency:
+            time.sleep(latency)
+
+    def _resolve(self, oid):
+        """Translate ('MIB', 'name', index, ...), 'name' or numeric oid into oid tuple
+        """
+
+        if isinstance(oid, (list, tuple)):
+            base = self._symbols.get(oid[1])
+            if base is None:
+                raise KeyError('Unknown MIB symbol {0}::{1}'.format(oid[0], oid[1]))
+            return base + tuple(int(part) for index in oid[2:] for part in str(index).split('.'))
+        if oid in self._symbols:
+            return self._symbols[oid]
+        return oid_to_tuple(oid)
+
+    def _get_next(self, oid):
+        position = bisect_left(self._oids, oid)
+        if position < len(self._oids) and self._oids[position] == oid:
+            position += 1
+        if position < len(self._oids):
+            return self._oids[position]
+        return None
+
+    def _get_name(self, oid):
+        """Split oid into MIB symbol name and index suffix
+        """
+
+        for length in range(len(oid) - 1, 0, -1):
+            name = self._symbol_names.get(oid[:length])
+            if name:
+                return name, oid[length:]
+        return oid_to_str(oid), ()
+
+    def _get_var_bind(self, oid, value):
+        """Build var bind the same way pysnmp returns it: (object identity, value)
+        """
+
+        name, suffix = self._get_name(oid)
+        if NUMERIC_OID_RE.search(value):
+            value = ReplayObjectIdentity(oid_to_tuple(value))
+        return ReplayObjectIdentity(oid, name, suffix), value
+
+    def update_mib_sources(self, mib_folder_path):
+        pass
+
+    def load_mib(self, mib_list):
+        pass
+
+    def get(self, *oids):
+        result = OrderedDict()
+        requested = []
+        for oid in oids:
+            if isinstance(oid, (list, tuple)):
+                oid = list(oid)
+                if len(oid) == 2:
+                    oid.append(0)
+            elif not oid.endswith('.0'):
+                oid += '.0'
+            oid = self._resolve(oid)
+            requested.append(oid)
+            name, suffix = self._get_name(oid)
+            result[name] = self._records.get(oid, NO_SUCH_INSTANCE)
+        self._request(requested, zip(requested, result.values()))
+        self.var_binds = [self._get_var_bind(requested_oid, value)
+                          for requested_oid, value in zip(requested, result.values())]
+        return result
+
+    def get_property(self, snmp_module_name, property_name, index, return_type='str'):
+        if isinstance(index, str):
+            index_list = index.split('.')
+        else:
+            index_list = [index]
+        try:
+            return_value = self.get((snmp_module_name, property_name) + tuple(index_list)).values()[0].strip(' \t\n\r')
+            if 'int' in return_type:
+                return_value = int(return_value)
+        except Exception:
+            if return_type == 'int':
+                return_value = 0
+            else:
+                return_value = ''
+        return return_value
+
+    def get_properties(self, snmp_mib_name, index, properties_map):
+        result = QualiMibTable(snmp_mib_name)
+        result[index] = {}
+        for command_key, command_type in properties_map.iteritems():
+            result[index][command_key] = self.get_property(snmp_mib_name, command_key, index, command_type)
+        return result
+
+    def get_table_oid(self, snmp_module_name, table_name):
+        return self._resolve((snmp_module_name, table_name))
+
+    def get_bulk(self, oid, max_repetitions, timeout):
+        """Single GETBULK request, the same interface as QualiSnmpBulkClient.get_bulk provides.
+        Response takes latency plus var_bind_latency for every returned var bind, requests lost with drop_rate
+        probability and responses which would take longer than the timeout raise SnmpRequestTimeout
+        after the timeout elapses. Responses are cut to max_response_size the same way agents do it (RFC 3416 4.2.3).
+
+        :return: list of (OID tuple, column name, index suffix, value, var bind) following the requested OID,
+            value is None for endOfMibView
+        :raise SnmpResponseTooBig: if even a single var bind doesn't fit into max_response_size
+        """
+
+        response_var_binds = []
+        response_size = self.PDU_OVERHEAD
+        current = tuple(oid)
+        while len(response_var_binds) < max_repetitions:
+            next_oid = self._get_next(current)
+            if next_oid is None:
+                response_var_binds.append((current, None))
+                break
+            response_size += 2 * len(next_oid) + len(self._records[next_oid])
+            if self.max_response_size and response_size > self.max_response_size:
+                if not response_var_binds:
+                    self._request([oid], [], self.latency)
+                    raise SnmpResponseTooBig('tooBig')
+                break
+            current = next_oid
+            response_var_binds.append((current, self._records[current]))
+        latency = self.latency + self.var_bind_latency * len(response_var_binds)
+        if latency > timeout or self._random.random() < self.drop_rate:
+            self.timeout_count += 1
+            self._request([oid], None, timeout)
+            raise SnmpRequestTimeout('No SNMP response received before timeout')
+        self._request([oid], response_var_binds, latency)
+
+        result = []
+        for next_oid, value in response_var_binds:
+            if value is None:
+                result.append((next_oid, '', '', None, None))
+                continue
+            name, suffix = self._get_name(next_oid)
+            result.append((next_oid, name, oid_to_str(suffix), value, self._get_var_bind(next_oid, value)))
+        return result
+
+    def get_table(self, snmp_module_name, table_name):
+        try:
+            return self.walk((snmp_module_name, table_name))
+        except KeyError:
+            return QualiMibTable(table_name)
+
+    def walk(self, oid, *indexes):
+        """Walk the subtree with GETNEXT requests, one request per received row plus the terminating one
+        """
+
+        base = self._resolve(oid)
+        result = QualiMibTable(oid[1] if isinstance(oid, (list, tuple)) else str(oid))
+        self.var_binds = []
+        current = base
+        while True:
+            next_oid = self._get_next(current)
+            if next_oid is None or next_oid[:len(base)] != base:
+                self._request([current], [])
+                break
+            self._request([current], [(next_oid, self._records[next_oid])])
+            self.var_binds.append([self._get_var_bind(next_oid, self._records[next_oid])])
+            current = next_oid
+            name, suffix = self._get_name(next_oid)
+            suffix = oid_to_str(suffix)
+            if suffix.isdigit():
+                index = int(suffix)
+            elif suffix.replace('.', '', 1).isdigit():
+                index = float(suffix)
+            else:
+                index = suffix
+            if not result.get(index):
+                result[index] = {'suffix': suffix}
+            result[index][name] = self._records[next_oid]
+        if indexes:
+            result = result.get_rows(*indexes)
+        return result
@@ -0,0 +1,344 @@
+import logging
+import select
+import socket
+import threading
+import time
+import unittest
+
+from mock import MagicMock
+from pyasn1.type import univ
+from pysnmp.carrier.asyncore.dgram import udp
+from pysnmp.entity import engine, config
+from pysnmp.entity.rfc3413 import cmdrsp, context
+from pysnmp.error import PySnmpError
+from pysnmp.proto import errind
+
+from cloudshell.networking.ericsson.extended.ericsson_adaptive_walker import AdaptiveSnmpWalker, \
+    QualiSnmpBulkClient, SnmpRequestTimeout, SnmpResponseTooBig
+from cloudshell.snmp.quali_snmp import QualiSnmp
+from cloudshell.tests.autoload_benchmark import build_ssr_records
+from cloudshell.tests.replay_snmp_handler import ReplaySnmpHandler, MIB_SYMBOLS, oid_to_tuple
+
+
+class ScriptedReplaySnmpHandler(ReplaySnmpHandler):
+    def __init__(self, records, lost_requests=(), too_big_repetitions=None, **kwargs):
+        """Replay handler which loses the listed GETBULK requests and records every GETBULK it receives
+
+        :param lost_requests: numbers of GETBULK requests which are never answered, starting from 1
+        :param too_big_repetitions: answer tooBig to requests with larger max-repetitions
+        """
+
+        super(ScriptedReplaySnmpHandler, self).__init__(records, **kwargs)
+        self.lost_requests = set(lost_requests)
+        self.too_big_repetitions = too_big_repetitions
+        self.bulk_requests = []
+
+    def get_bulk(self, oid, max_repetitions, timeout):
+        self.bulk_requests.append((tuple(oid), max_repetitions, timeout))
+        if len(self.bulk_requests) in self.lost_requests:
+            self.timeout_count += 1
+            self._request([oid], None, timeout)
+            raise SnmpRequestTimeout('No SNMP response received before timeout')
+        if self.too_big_repetitions and max_repetitions > self.too_big_repetitions:
+            self._request([oid], [])
+            raise SnmpResponseTooBig('tooBig')
+        return super(ScriptedReplaySnmpHandler, self).get_bulk(oid, max_repetitions, timeout)
+
+
+class TestAdaptiveSnmpWalker(unittest.TestCase):
+    def setUp(self):
+        self.records = build_ssr_records(2, 96)
+        self.getnext_handler = ReplaySnmpHandler(self.records)
+
+    def _walk(self, snmp_handler, table_name, **kwargs):
+        walker = AdaptiveSnmpWalker(snmp_handler, **kwargs)
+        table = walker.walk('IF-MIB', table_name)
+        self.assertEqual(table, self.getnext_handler.get_table('IF-MIB', table_name))
+        return walker
+
+    def test_walk_returns_the_same_table_as_getnext_walk(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records)
+        for table_name in ('entPhysicalDescr', 'entPhysicalClass', 'ifDescr', 'ifMauAutoNegAdminStatus',
+                           'lldpRemTable', 'entLastChangeTime'):
+            self._walk(snmp_handler, table_name)
+
+    def test_walk_grows_max_repetitions_on_fast_small_responses(self):
+        walker = self._walk(ScriptedReplaySnmpHandler(self.records), 'ifDescr', max_repetitions=4)
+        self.assertGreater(walker.max_repetitions, 4)
+        self.assertLess(walker.request_count, 96 // 4)
+
+    def test_walk_resumes_from_last_received_oid_after_lost_request(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, lost_requests=[2])
+        walker = self._walk(snmp_handler, 'ifDescr', max_repetitions=10, max_repetitions_limit=10)
+
+        first_response = ReplaySnmpHandler.get_bulk(snmp_handler, snmp_handler.bulk_requests[0][0], 10, 1.0)
+        self.assertEqual(snmp_handler.bulk_requests[1][0], first_response[-1][0])
+        self.assertEqual(snmp_handler.bulk_requests[2][0], first_response[-1][0])
+        self.assertEqual(walker.timeout_count, 1)
+
+    def test_walk_doubles_timeout_on_every_timeout(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, lost_requests=[2, 3, 4, 5])
+        self._walk(snmp_handler, 'ifDescr', timeout=1.0, max_timeout=4.0)
+
+        self.assertEqual([timeout for oid, max_repetitions, timeout in snmp_handler.bulk_requests[1:6]],
+                         [1.0, 2.0, 4.0, 4.0, 4.0])
+
+    def test_walk_keeps_max_repetitions_after_single_timeout_and_halves_them_after_repeated_one(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, lost_requests=[2, 4, 5, 6])
+        self._walk(snmp_handler, 'ifDescr', max_repetitions=16, max_repetitions_limit=16)
+
+        self.assertEqual([max_repetitions for oid, max_repetitions, timeout in snmp_handler.bulk_requests[1:7]],
+                         [16, 16, 16, 16, 8, 4])
+
+    def test_walk_halves_max_repetitions_on_too_big(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, too_big_repetitions=5)
+        walker = self._walk(snmp_handler, 'ifDescr', max_repetitions=40, max_retries=10)
+
+        self.assertEqual([max_repetitions for oid, max_repetitions, timeout in snmp_handler.bulk_requests[:4]],
+                         [40, 20, 10, 5])
+        self.assertEqual(walker.timeout_count, 0)
+
+    def test_walk_fails_after_max_retries(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, lost_requests=range(1, 10))
+        walker = AdaptiveSnmpWalker(snmp_handler, max_retries=3)
+
+        self.assertRaises(SnmpRequestTimeout, walker.walk, 'IF-MIB', 'ifDescr')
+        self.assertEqual(walker.request_count, 4)
+
+    def test_truncated_responses_do_not_end_walk(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records, max_response_size=400)
+        walker = self._walk(snmp_handler, 'entPhysicalDescr', max_repetitions=50)
+
+        oid, max_repetitions, timeout = snmp_handler.bulk_requests[0]
+        self.assertLess(len(ReplaySnmpHandler.get_bulk(snmp_handler, oid, max_repetitions, timeout)), 50)
+        self.assertGreater(len(snmp_handler.bulk_requests), 2)
+        self.assertLess(walker.max_repetitions, 50)
+
+    def test_walk_stops_at_the_end_of_column_with_expected_rows(self):
+        rows = len(self.getnext_handler.get_table('IF-MIB', 'ifDescr'))
+        snmp_handler = ScriptedReplaySnmpHandler(self.records)
+        walker = AdaptiveSnmpWalker(snmp_handler, max_repetitions=50, max_repetitions_limit=50)
+        table = walker.walk('IF-MIB', 'ifDescr', expected_rows=rows)
+
+        self.assertEqual(table, self.getnext_handler.get_table('IF-MIB', 'ifDescr'))
+        self.assertEqual(sum(max_repetitions for oid, max_repetitions, timeout in snmp_handler.bulk_requests),
+                         rows + 1)
+        self.assertEqual(walker.max_repetitions, 50)
+
+    def test_walk_continues_past_expected_rows(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records)
+        walker = AdaptiveSnmpWalker(snmp_handler, max_repetitions=20, max_repetitions_limit=20)
+        table = walker.walk('IF-MIB', 'ifDescr', expected_rows=10)
+
+        self.assertEqual(table, self.getnext_handler.get_table('IF-MIB', 'ifDescr'))
+        self.assertEqual([max_repetitions for oid, max_repetitions, timeout in snmp_handler.bulk_requests[:3]],
+                         [11, 20, 20])
+
+    def test_walk_reads_only_the_range_of_rows(self):
+        for table_name, first_index, last_index, indexes in (
+                ('ifDescr', 20005, 20030, range(20005, 20031)),
+                ('ifMauAutoNegAdminStatus', '10003.1', '10010.1', range(10003, 10011)),
+                ('ifDescr', 10096, 20001, [10096, 20001])):
+            walker = AdaptiveSnmpWalker(ScriptedReplaySnmpHandler(self.records), max_repetitions=50)
+            table = walker.walk('IF-MIB', table_name, first_index=first_index, last_index=last_index)
+
+            expected = self.getnext_handler.get_table('IF-MIB', table_name)
+            self.assertEqual(sorted(table), sorted(key for key in expected if int(key) in indexes))
+            self.assertEqual(walker.request_count, 1)
+
+    def test_walk_ends_on_end_of_mib_view(self):
+        snmp_handler = ScriptedReplaySnmpHandler(self.records)
+        walker = self._walk(snmp_handler, 'entLastChangeTime')
+
+        response = ReplaySnmpHandler.get_bulk(snmp_handler, snmp_handler.bulk_requests[0][0], 10, 1.0)
+        self.assertEqual([var_bind[0] for var_bind in response], [max(self.records)] * 2)
+        self.assertEqual(response[-1][3], None)
+        self.assertEqual(walker.request_count, 1)
+
+
+class SnmpAgent(object):
+    def __init__(self):
+        """pysnmp command responder serving its own SNMPv2-MIB and SNMP-FRAMEWORK-MIB objects on localhost
+        """
+
+        self.engine = engine.SnmpEngine()
+        transport = udp.UdpTransport().openServerMode(('127.0.0.1', 0))
+        self.address = transport.socket.getsockname()
+        config.addTransport(self.engine, udp.domainName, transport)
+        config.addV1System(self.engine, 'test-area', 'public')
+        config.addVacmUser(self.engine, 2, 'test-area', 'noAuthNoPriv', (1, 3, 6), (1, 3, 6))
+        snmp_context = context.SnmpContext(self.engine)
+        cmdrsp.GetCommandResponder(self.engine, snmp_context)
+        cmdrsp.NextCommandResponder(self.engine, snmp_context)
+        cmdrsp.BulkCommandResponder(self.engine, snmp_context)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def _run(self):
+        self.engine.transportDispatcher.jobStarted(1)
+        try:
+            self.engine.transportDispatcher.runDispatcher()
+        finally:
+            self.engine.transportDispatcher.closeDispatcher()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.engine.transportDispatcher.jobFinished(1)
+        self._thread.join(5)
+
+
+class LossyUdpProxy(object):
+    def __init__(self, agent_address):
+        """UDP proxy in front of the agent which loses the selected requests
+
+        :param agent_address: (host, port) of the agent
+        """
+
+        self.agent_address = agent_address
+        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client_socket.bind(('127.0.0.1', 0))
+        self.address = self.client_socket.getsockname()
+        self.agent_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.agent_socket.bind(('127.0.0.1', 0))
+        self.request_count = 0
+        self.lost_requests = set()
+        self.lose_all = False
+        self._client_address = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def reset(self, lost_requests=(), lose_all=False):
+        self.request_count = 0
+        self.lost_requests = set(lost_requests)
+        self.lose_all = lose_all
+
+    def _run(self):
+        while not self._stopped.is_set():
+            readable, writable, failed = select.select([self.client_socket, self.agent_socket], [], [], 0.1)
+            for readable_socket in readable:
+                data, address = readable_socket.recvfrom(65535)
+                if readable_socket is self.agent_socket:
+                    if self._client_address:
+                        self.client_socket.sendto(data, self._client_address)
+                    continue
+                self._client_address = address
+                self.request_count += 1
+                if not self.lose_all and self.request_count not in self.lost_requests:
+                    self.agent_socket.sendto(data, self.agent_address)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(5)
+        self.client_socket.close()
+        self.agent_socket.close()
+
+
+class TestQualiSnmpBulkClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.agent = SnmpAgent()
+        cls.agent.start()
+        cls.proxy = LossyUdpProxy(cls.agent.address)
+        cls.proxy.start()
+        logger = logging.getLogger('test_adaptive_snmp_walker')
+        logger.addHandler(logging.NullHandler())
+        cls.snmp_handler = QualiSnmp(ip=cls.proxy.address[0], port=cls.proxy.address[1], snmp_version='2',
+                                     snmp_community='public', logger=logger)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+        cls.agent.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+
+    def test_walk_returns_the_same_table_as_quali_snmp_walk(self):
+        walker = AdaptiveSnmpWalker(self.snmp_handler, max_repetitions=3)
+        table = walker.walk('SNMPv2-MIB', 'system')
+        expected_table = self.snmp_handler.get_table('SNMPv2-MIB', 'system')
+
+        self.assertEqual(sorted(table[0].keys()), sorted(expected_table[0].keys()))
+        for column_name in ('sysDescr', 'sysObjectID', 'sysServices', 'suffix'):
+            self.assertEqual(table[0][column_name], expected_table[0][column_name])
+        self.assertEqual(len(walker.var_binds), len(self.snmp_handler.var_binds))
+        self.assertEqual(walker.var_binds[0][0][0].getMibSymbol()[1], 'sysDescr')
+        self.assertGreater(walker.request_count, 1)
+
+    def test_walk_resumes_from_last_received_oid_after_lost_request(self):
+        expected_table = self.snmp_handler.get_table('SNMPv2-MIB', 'snmp')
+        self.proxy.reset(lost_requests=[2])
+        walker = AdaptiveSnmpWalker(self.snmp_handler, max_repetitions=5, max_repetitions_limit=5, timeout=0.3)
+        table = walker.walk('SNMPv2-MIB', 'snmp')
+
+        self.assertEqual(walker.timeout_count, 1)
+        self.assertEqual(sorted(table[0].keys()), sorted(expected_table[0].keys()))
+        self.assertEqual(self.proxy.request_count, walker.request_count)
+        self.assertEqual(walker.request_count, len(expected_table[0]) // 5 + 2)
+
+    def test_get_bulk_raises_timeout_without_pysnmp_retries(self):
+        bulk_client = QualiSnmpBulkClient(self.snmp_handler)
+        table_oid = bulk_client.get_table_oid('SNMPv2-MIB', 'sysDescr')
+        self.proxy.reset(lose_all=True)
+        start_time = time.time()
+
+        self.assertRaises(SnmpRequestTimeout, bulk_client.get_bulk, table_oid, 5, 0.3)
+        self.assertLess(time.time() - start_time, 1.5)
+        self.assertEqual(self.proxy.request_count, 1)
+
+    def test_get_bulk_uses_separate_target_for_every_timeout(self):
+        bulk_client = QualiSnmpBulkClient(self.snmp_handler)
+        table_oid = bulk_client.get_table_oid('SNMPv2-MIB', 'system')
+
+        self.assertEqual(bulk_client.get_bulk(table_oid, 3, 0.5)[0][1], 'sysDescr')
+        self.assertEqual(bulk_client.get_bulk(table_oid, 3, 2.0)[0][1], 'sysDescr')
+        self.assertIs(bulk_client._get_target(0.5), bulk_client._get_target(0.5))
+        self.assertNotEqual(bulk_client._get_target(0.5).tagList, bulk_client._get_target(2.0).tagList)
+        self.assertEqual(bulk_client._get_target(2.0).timeout, 2.0)
+        self.assertEqual(bulk_client._get_target(2.0).retries, 0)
+
+    def test_walk_does_not_load_mibs_into_snmp_handler(self):
+        logger = logging.getLogger('test_adaptive_snmp_walker')
+        snmp_handler = QualiSnmp(ip=self.proxy.address[0], port=self.proxy.address[1], snmp_version='2',
+                                 snmp_community='public', logger=logger)
+        table = AdaptiveSnmpWalker(snmp_handler).walk('IF-MIB', 'ifDescr')
+
+        self.assertEqual(len(table), 0)
+        self.assertNotIn('IF-MIB', snmp_handler.mib_builder.mibSymbols)
+
+    def test_get_table_oid_resolves_mib_symbols(self):
+        bulk_client = QualiSnmpBulkClient(self.snmp_handler)
+
+        self.assertEqual(bulk_client.get_table_oid('SNMPv2-MIB', 'sysDescr'), oid_to_tuple(MIB_SYMBOLS['sysDescr']))
+
+    @staticmethod
+    def _get_mocked_snmp_handler():
+        snmp_handler = MagicMock()
+        snmp_handler.target.transportAddr = ('127.0.0.1', 161)
+        return snmp_handler
+
+    def test_get_bulk_maps_too_big_error_status(self):
+        snmp_handler = self._get_mocked_snmp_handler()
+        snmp_handler.cmd_gen.bulkCmd.return_value = (None, univ.Integer(1), 0, [])
+
+        self.assertRaises(SnmpResponseTooBig, QualiSnmpBulkClient(snmp_handler).get_bulk, (1, 3, 6), 5, 1.0)
+
+    def test_get_bulk_raises_other_errors(self):
+        snmp_handler = self._get_mocked_snmp_handler()
+        snmp_handler.cmd_gen.bulkCmd.return_value = (None, univ.Integer(5), 1, [])
+        self.assertRaises(PySnmpError, QualiSnmpBulkClient(snmp_handler).get_bulk, (1, 3, 6), 5, 1.0)
+
+        snmp_handler.cmd_gen.bulkCmd.return_value = (errind.unknownCommunityName, 0, 0, [])
+        self.assertRaises(PySnmpError, QualiSnmpBulkClient(snmp_handler).get_bulk, (1, 3, 6), 5, 1.0)
+
+        snmp_handler.cmd_gen.bulkCmd.return_value = (errind.tooBig, 0, 0, [])
+        self.assertRaises(SnmpResponseTooBig, QualiSnmpBulkClient(snmp_handler).get_bulk, (1, 3, 6), 5, 1.0)
+
+        snmp_handler.cmd_gen.bulkCmd.return_value = (errind.requestTimedOut, 0, 0, [])
+        self.assertRaises(SnmpRequestTimeout, QualiSnmpBulkClient(snmp_handler).get_bulk, (1, 3, 6), 5, 1.0)
@@ -0,0 +1,90 @@
+import logging
+import unittest
+
+from cloudshell.tests.autoload_benchmark import build_ssr_configuration, build_ssr_records, run_autoload
+from cloudshell.tests.replay_snmp_handler import ReplaySnmpHandler
+
+MODES = {
+    'bulk': {'adaptive_walk': False},
+    'legacy': {'bulk_mode': False, 'adaptive_walk': False},
+    'pipelined': {'adaptive_walk': False, 'max_in_flight': 4},
+    'adaptive': {'adaptive_walk': True},
+}
+LINECARDS = 2
+SMALL_PORTS = 96
+LARGE_PORTS = 384
+
+
+def run_mode(records, **attributes):
+    """Autoload replayed device
+
+    :return: tuple (sorted resources and attributes, number of requests sent by all snmp handlers)
+    """
+
+    logger = logging.getLogger('autoload_scaling_test')
+    logger.addHandler(logging.NullHandler())
+    snmp_handlers = []
+
+    def snmp_handler_factory():
+        snmp_handlers.append(ReplaySnmpHandler(records))
+        return snmp_handlers[-1]
+
+    result, wall_time = run_autoload(snmp_handler_factory(), build_ssr_configuration(), logger,
+                                     snmp_handler_factory=snmp_handler_factory, **attributes)
+    output = sorted((resource.model, resource.name, resource.relative_address, resource.unique_identifier)
+                    for resource in result.resources) + \
+        sorted((attribute.relative_address, attribute.attribute_name, attribute.attribute_value)
+               for attribute in result.attributes)
+    return output, sum(snmp_handler.request_count for snmp_handler in snmp_handlers)
+
+
+class TestAutoloadScaling(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.records = {}
+        cls.outputs = {}
+        cls.requests = {}
+        for ports in (SMALL_PORTS, LARGE_PORTS):
+            cls.records[ports] = build_ssr_records(LINECARDS, ports)
+            for mode, attributes in MODES.iteritems():
+                cls.outputs[mode, ports], cls.requests[mode, ports] = run_mode(cls.records[ports], **attributes)
+
+    def test_all_modes_build_the_same_result(self):
+        for ports in (SMALL_PORTS, LARGE_PORTS):
+            self.assertEqual(len([item for item in self.outputs['bulk', ports] if item[0] == 'Generic Port']), ports)
+            for mode in MODES:
+                self.assertEqual(self.outputs[mode, ports], self.outputs['bulk', ports], mode)
+
+    def test_lldp_neighbors_are_matched_to_their_own_ports(self):
+        # every third port has a neighbor, see build_ssr_records
+        for ports in (SMALL_PORTS, LARGE_PORTS):
+            for mode in MODES:
+                for item in self.outputs[mode, ports]:
+                    if len(item) != 3 or item[1] != 'Adjacent':
+                        continue
+                    relative_address, attribute_name, attribute_value = item
+                    slot, port = map(int, relative_address.split('/')[1::2])
+                    expected = 'peer-{0} through ethernet 9/{1}'.format(slot, port) if port % 3 == 1 else ''
+                    self.assertEqual(attribute_value, expected, mode)
+
+    def test_getnext_walks_read_every_record_once(self):
+        # every added port adds the same records, GETNEXT walks need exactly one request per record
+        added_records = len(self.records[LARGE_PORTS]) - len(self.records[SMALL_PORTS])
+        for mode in ('bulk', 'pipelined'):
+            self.assertEqual(self.requests[mode, LARGE_PORTS] - self.requests[mode, SMALL_PORTS], added_records, mode)
+        self.assertEqual(self.requests['pipelined', SMALL_PORTS], self.requests['bulk', SMALL_PORTS])
+
+    def test_request_count_grows_linearly_with_ports(self):
+        ports_ratio = float(LARGE_PORTS) / SMALL_PORTS
+        for mode in MODES:
+            self.assertLessEqual(float(self.requests[mode, LARGE_PORTS]) / self.requests[mode, SMALL_PORTS],
+                                 ports_ratio, mode)
+
+    def test_adaptive_walk_sends_fewer_requests(self):
+        for ports in (SMALL_PORTS, LARGE_PORTS):
+            self.assertLess(self.requests['adaptive', ports] * 10, self.requests['bulk', ports])
+        self.assertLess(self.requests['bulk', LARGE_PORTS], self.requests['legacy', LARGE_PORTS])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import logging
+import time
+import unittest
+
+from mock import patch
+
+from cloudshell.networking.ericsson.extended.ericsson_autoload_snapshot import AutoloadSnapshot, \
+    AutoloadSnapshotStore
+from cloudshell.tests.autoload_benchmark import build_ssr_configuration, build_ssr_records, run_autoload
+from cloudshell.tests.replay_snmp_handler import ReplaySnmpHandler, MIB_SYMBOLS, oid_to_tuple
+
+LINECARDS = 2
+PORTS = 48
+# the device was up for 1000 seconds when the first autoload was run, see build_ssr_records
+UPTIME = 1000
+HOUR = 3600
+
+
+def get_output(result):
+    return sorted((resource.model, resource.name, resource.relative_address, resource.unique_identifier)
+                  for resource in result.resources) + \
+        sorted((attribute.relative_address, attribute.attribute_name, attribute.attribute_value)
+               for attribute in result.attributes)
+
+
+class TestAutoloadSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('autoload_snapshot_test')
+        self.logger.addHandler(logging.NullHandler())
+        self.records = build_ssr_records(LINECARDS, PORTS)
+        self.store = AutoloadSnapshotStore()
+        self.full_requests = self._run_autoload()
+
+    def _set(self, symbol, index, value):
+        self.records[oid_to_tuple(MIB_SYMBOLS[symbol]) + (index,)] = value
+
+    def _run_autoload(self, elapsed_time=0):
+        """Autoload the replayed device with the snapshot store, elapsed_time seconds after the first autoload,
+        check that the result is the same as the one of the autoload without snapshots.
+        GETNEXT walks are used, so the number of requests shows how many tables were walked
+
+        :return: number of requests sent
+        """
+
+        snmp_handler = ReplaySnmpHandler(self.records)
+        with patch('time.time', return_value=time.time() + elapsed_time):
+            result, wall_time = run_autoload(snmp_handler, build_ssr_configuration(), self.logger,
+                                             snapshot_store=self.store, snapshot_key='10.0.0.1', adaptive_walk=False)
+        expected, wall_time = run_autoload(ReplaySnmpHandler(self.records), build_ssr_configuration(), self.logger)
+        self.assertEqual(get_output(result), get_output(expected))
+        return snmp_handler.request_count
+
+    def test_unchanged_device_uses_snapshot(self):
+        self.assertLess(self._run_autoload() * 10, self.full_requests)
+
+    def test_unchanged_device_uses_snapshot_later_in_the_same_boot(self):
+        self._set('sysUpTime', 0, str((UPTIME + 2 * HOUR) * 100))
+        self.assertLess(self._run_autoload(elapsed_time=2 * HOUR) * 10, self.full_requests)
+
+    def test_interface_change_reuses_entity_table(self):
+        self._set('ifAlias', 10003, 'changed alias')
+        self._set('ifTableLastChange', 0, '2000')
+        requests = self._run_autoload()
+        self.assertLess(requests, self.full_requests)
+        self.assertGreater(requests * 10, self.full_requests)
+
+    def test_entity_change_runs_full_autoload(self):
+        self._set('entPhysicalDescr', 10001, '48-port 10GE Card sn:NEW rev:4')
+        self._set('entLastChangeTime', 0, '3000')
+        self.assertEqual(self._run_autoload(), self.full_requests)
+
+    def test_reboot_runs_full_autoload(self):
+        # rebooted half an hour ago, uptime is still greater than the one of the first autoload
+        self._set('sysUpTime', 0, str(HOUR / 2 * 100))
+        self.assertEqual(self._run_autoload(elapsed_time=2 * HOUR), self.full_requests)
+
+    def test_snapshot_is_valid_only_within_the_same_boot(self):
+        change_markers = {'sysUpTime': UPTIME * 100, 'bootTime': 1000000.0}
+        snapshot = AutoloadSnapshot('fingerprint', change_markers, {}, [], [])
+        self.assertTrue(snapshot.is_valid('fingerprint', {'sysUpTime': (UPTIME + HOUR) * 100,
+                                                          'bootTime': 1000001.5}))
+        self.assertFalse(snapshot.is_valid('other', change_markers))
+        self.assertFalse(snapshot.is_valid('fingerprint', {'sysUpTime': (UPTIME + HOUR) * 100,
+                                                           'bootTime': 1000000.0 + HOUR}))
+        self.assertFalse(AutoloadSnapshot('fingerprint', {'sysUpTime': UPTIME * 100}, {}, [], []).is_valid(
+            'fingerprint', change_markers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import pickle
+import unittest
+
+from cloudshell.networking.ericsson.extended.ericsson_indexed_collections import IndexedList, PortMapping
+
+ITEMS = 2000
+
+
+class ComparedIndex(object):
+    """Entity or interface index which counts how many times it was compared with other indexes"""
+
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __eq__(self, other):
+        ComparedIndex.comparisons += 1
+        return isinstance(other, ComparedIndex) and self.value == other.value
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class TestIndexedList(unittest.TestCase):
+    def test_membership_does_not_scan_the_list(self):
+        indexes = IndexedList(ComparedIndex(value) for value in range(ITEMS))
+        ComparedIndex.comparisons = 0
+        # equal but not identical indexes, so every hit needs at least one comparison
+        self.assertTrue(all(ComparedIndex(value) in indexes for value in range(ITEMS)))
+        self.assertFalse(any(ComparedIndex(value) in indexes for value in range(ITEMS, 2 * ITEMS)))
+        # linear scan would need ITEMS * ITEMS comparisons
+        self.assertLessEqual(ComparedIndex.comparisons, 2 * ITEMS)
+
+    def test_membership_follows_list_changes(self):
+        indexes = IndexedList([1, 2, 2, 3])
+        indexes.remove(2)
+        self.assertIn(2, indexes)
+        indexes.remove(2)
+        self.assertNotIn(2, indexes)
+        self.assertEqual(indexes.pop(0), 1)
+        self.assertNotIn(1, indexes)
+        indexes.insert(0, 4)
+        indexes += [5]
+        self.assertEqual(indexes, [4, 3, 5])
+        self.assertTrue(all(index in indexes for index in (3, 4, 5)))
+        self.assertRaises(ValueError, indexes.remove, 1)
+        self.assertRaises(TypeError, indexes.__setitem__, 0, 1)
+
+    def test_pickled_list_keeps_index(self):
+        indexes = pickle.loads(pickle.dumps(IndexedList([1, 2]), pickle.HIGHEST_PROTOCOL))
+        self.assertIsInstance(indexes, IndexedList)
+        self.assertEqual(indexes, [1, 2])
+        self.assertIn(2, indexes)
+
+
+class TestPortMapping(unittest.TestCase):
+    def test_has_interface_does_not_scan_the_mapping(self):
+        port_mapping = PortMapping()
+        for value in range(ITEMS):
+            port_mapping[value] = ComparedIndex(value)
+        ComparedIndex.comparisons = 0
+        self.assertTrue(all(port_mapping.has_interface(ComparedIndex(value)) for value in range(ITEMS)))
+        self.assertFalse(any(port_mapping.has_interface(ComparedIndex(value)) for value in range(ITEMS, 2 * ITEMS)))
+        self.assertLessEqual(ComparedIndex.comparisons, 2 * ITEMS)
+
+    def test_has_interface_follows_mapping_changes(self):
+        port_mapping = PortMapping()
+        port_mapping.update({1: 10, 2: 10, 3: 30})
+        port_mapping[3] = 31
+        self.assertFalse(port_mapping.has_interface(30))
+        del port_mapping[1]
+        self.assertTrue(port_mapping.has_interface(10))
+        port_mapping.pop(2)
+        self.assertFalse(port_mapping.has_interface(10))
+        self.assertEqual(port_mapping.setdefault(4, 40), 40)
+        port_mapping = pickle.loads(pickle.dumps(port_mapping, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(port_mapping, {3: 31, 4: 40})
+        self.assertTrue(port_mapping.has_interface(40))
+        port_mapping.clear()
+        self.assertFalse(port_mapping.has_interface(31))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from cloudshell.networking.ericsson.extended.ericsson_mib_resolver import MibSymbolResolver
+from cloudshell.tests.replay_snmp_handler import MIB_SYMBOLS, oid_to_tuple
+
+
+class TestMibSymbolResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = MibSymbolResolver()
+
+    def test_get_oid_resolves_symbols(self):
+        self.assertEqual(self.resolver.get_oid('IF-MIB', 'ifDescr'), oid_to_tuple(MIB_SYMBOLS['ifDescr']))
+        self.assertEqual(self.resolver.get_oid('ENTITY-MIB', 'entPhysicalDescr'),
+                         oid_to_tuple(MIB_SYMBOLS['entPhysicalDescr']))
+
+    def test_get_column_splits_column_and_index(self):
+        column_oid = self.resolver.get_oid('ENTITY-MIB', 'entPhysicalDescr')
+
+        self.assertEqual(self.resolver.get_column(column_oid + (10001,)), ('entPhysicalDescr', '10001'))
+        self.assertEqual(self.resolver.get_column(column_oid + (10002,)), ('entPhysicalDescr', '10002'))
+        self.assertEqual(self.resolver.get_column(self.resolver.get_oid('SNMPv2-MIB', 'sysUpTime') + (0,)),
+                         ('sysUpTime', '0'))
+
+    def test_get_column_does_not_cache_nodes_of_not_loaded_mibs(self):
+        if_descr_oid = oid_to_tuple(MIB_SYMBOLS['ifDescr'])
+        self.resolver.get_oid('SNMPv2-MIB', 'sysDescr')
+
+        self.assertNotEqual(self.resolver.get_column(if_descr_oid + (1,))[0], 'ifDescr')
+        self.resolver.get_oid('IF-MIB', 'ifDescr')
+        self.assertEqual(self.resolver.get_column(if_descr_oid + (1,)), ('ifDescr', '1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
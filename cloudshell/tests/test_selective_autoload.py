@@ -0,0 +1,79 @@
+import logging
+import unittest
+
+from cloudshell.networking.ericsson.extended.ericsson_extended_snmp_autoload import EricssonExtendedSNMPAutoload
+from cloudshell.tests.autoload_benchmark import build_ssr_configuration, build_ssr_records
+from cloudshell.tests.replay_snmp_handler import ReplaySnmpHandler
+
+LINECARDS = 4
+PORTS = 384
+
+
+class TestSelectiveAutoload(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('selective_autoload_test')
+        cls.logger.addHandler(logging.NullHandler())
+        cls.records = build_ssr_records(LINECARDS, PORTS)
+        cls.full_output, cls.full_requests = cls._run_autoload()
+
+    @classmethod
+    def _run_autoload(cls, selection=None, **attributes):
+        """Autoload the replayed device, selectively if selection is provided
+
+        :param selection: tuple (relative path, resource classes)
+        :return: tuple (sorted resources and attributes, number of requests sent)
+        """
+
+        snmp_handler = ReplaySnmpHandler(cls.records)
+        autoload = EricssonExtendedSNMPAutoload(snmp_handler=snmp_handler, logger=cls.logger, supported_os=['SEOS'])
+        autoload.configuration = build_ssr_configuration()
+        for attribute_name, attribute_value in attributes.iteritems():
+            setattr(autoload, attribute_name, attribute_value)
+        if selection is None:
+            result = autoload.get_autoload_details()
+        else:
+            result = autoload.get_selective_autoload_details(*selection)
+        output = sorted((resource.model, resource.name, resource.relative_address, resource.unique_identifier)
+                        for resource in result.resources) + \
+            sorted((attribute.relative_address, attribute.attribute_name, attribute.attribute_value)
+                   for attribute in result.attributes)
+        return output, snmp_handler.request_count
+
+    def _run_selective_autoload(self, relative_path, resource_classes, **attributes):
+        """Autoload selected resources, check that they and their attributes are the same as the full autoload ones
+
+        :return: tuple (relative addresses of the loaded resources, number of requests sent)
+        """
+
+        output, requests = self._run_autoload((relative_path, resource_classes), **attributes)
+        resources = [item for item in output if len(item) == 4]
+        relative_addresses = [resource[2] for resource in resources]
+        self.assertEqual(output, [item for item in self.full_output if item in resources or
+                                  len(item) == 3 and item[0] in relative_addresses])
+        return relative_addresses, requests
+
+    def test_linecard_path_sends_less_requests_than_full_autoload(self):
+        relative_addresses, requests = self._run_selective_autoload('0/2', None)
+        self.assertEqual(len([relative_address for relative_address in relative_addresses
+                              if relative_address.count('/') == 3]), PORTS // LINECARDS)
+        self.assertLess(requests, self.full_requests)
+
+    def test_port_path_reads_only_its_port(self):
+        relative_addresses, requests = self._run_selective_autoload('0/2/0/3', None)
+        self.assertEqual(relative_addresses, ['0/2/0/3'])
+        linecard_addresses, linecard_requests = self._run_selective_autoload('0/2', None)
+        self.assertLess(requests, linecard_requests)
+
+    def test_ports_of_the_whole_device_send_less_requests_than_full_autoload(self):
+        relative_addresses, requests = self._run_selective_autoload(None, ['ports'])
+        self.assertEqual(len(relative_addresses), PORTS)
+        self.assertLess(requests, self.full_requests)
+
+    def test_port_path_without_adaptive_walk(self):
+        relative_addresses, requests = self._run_selective_autoload('0/2/0/3', None, adaptive_walk=False)
+        self.assertEqual(relative_addresses, ['0/2/0/3'])
+
+
+if __name__ == '__main__':
+    unittest.main()